@@ -0,0 +1,105 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from collections import OrderedDict
+from threading import Lock
+import copy
+import time
+
+from checkweb.caching import AUTH, model_versions
+from checkweb.models import FeedToken
+
+
+class TTLCache:
+    """Thread-safe dict of at most maxsize entries (least recently used dropped first),
+    each valid for ttl seconds (or as given on set)"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize, self.ttl = maxsize, ttl
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication keeping token -> (user with role, token) per process, so
+    authenticated requests need no auth queries; an entry is dropped after TOKEN_CACHE_TTL
+    seconds (0: not cached) or as soon as a Token, a User's groups, username or is_active
+    changed (see checkweb.caching.AUTH, shared between processes only by a shared cache)"""
+
+    def authenticate_credentials(self, key):
+        if not settings.TOKEN_CACHE_TTL:
+            return super().authenticate_credentials(key)
+
+        versions = model_versions(AUTH)
+        cached = token_cache.get(key)
+        if cached is not None and cached[0] == versions:
+            user, token = cached[1], cached[2]
+            # own copy per request, the cached one is shared between threads
+            return copy.copy(user), token
+
+        user, token = super().authenticate_credentials(key)
+        user.group_names  # role loaded once, cached with the user
+        token_cache.set(key, (versions, user, token), settings.TOKEN_CACHE_TTL)
+        return copy.copy(user), token
+
+
+class FeedTokenAuthentication(TokenAuthentication):
+    """Feed token (not the API token) given as ?token=..., for clients (like calendar apps) that
+    can not set headers; only for the feed views, see checkweb.models.FeedToken"""
+
+    model = FeedToken
+
+    def authenticate(self, request):
+        key = request.query_params.get("token")
+        if not key:
+            return None
+        return self.authenticate_credentials(key)
+
+
+async def aauthenticate(request):
+    """User of the request's "Authorization: Token ..." header (or None), for async views"""
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b"token":
+        return None
+
+    def authenticate(key):
+        user, token = CachedTokenAuthentication().authenticate_credentials(key)
+        user.group_names  # role loaded here (if not cached), views may not query
+        return user
+
+    try:
+        return await sync_to_async(authenticate)(auth[1].decode())
+    except (exceptions.AuthenticationFailed, UnicodeError):
+        return None
@@ -0,0 +1,64 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+from checkweb.caching import model_versions
+
+
+def versioned_response(request, name, models, build):
+    """Response of build() cached until one of the models changes, with ETag;
+    304 if the client's copy is still current, both without touching the DB
+
+    Args:
+        name (str): unique name of the response
+        models (list): models build() depends on, see checkweb.caching
+        build (callable): returns the data of the response
+    """
+    versions = model_versions(*models)
+    # Guard: versions not kept by the cache (e.g. DummyCache), nothing known to be current
+    if None in versions:
+        return Response(build())
+
+    versions = "-".join(str(version) for version in versions)
+    etag = f'"{name}-{versions}"'
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    key = f"response:{name}:{versions}"
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data)
+
+    response = Response(data)
+    response["ETag"] = etag
+    return response
+
+
+async def aversioned_response(request, name, models, abuild):
+    """versioned_response for async views, with abuild() a coroutine function"""
+    versions = await sync_to_async(model_versions)(*models)
+    # Guard: as versioned_response
+    if None in versions:
+        return JsonResponse(await abuild(), safe=False)
+
+    versions = "-".join(str(version) for version in versions)
+    etag = f'"{name}-{versions}"'
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    key = f"response:{name}:{versions}"
+    data = await cache.aget(key)
+    if data is None:
+        data = await abuild()
+        await cache.aset(key, data)
+
+    response = JsonResponse(data, safe=False)
+    response["ETag"] = etag
+    return response
@@ -0,0 +1,40 @@
+from django.db.models import Q
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+
+def encode_cursor(tut):
+    """Opaque cursor pointing at (date, id) of the last Tutoring of a page"""
+    return urlsafe_b64encode(f"{tut.date:%Y-%m-%d},{tut.id}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Returns (date, id) of the cursor; raises ValueError if invalid"""
+    try:
+        yyyy_mm_dd, tut_id = urlsafe_b64decode(cursor.encode()).decode().split(",")
+        return datetime.strptime(yyyy_mm_dd, "%Y-%m-%d").date(), int(tut_id)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_query(tuts, cursor):
+    """Tutorings after the cursor, newest first; seeks via (date, id) instead of OFFSET
+    so every page costs the same"""
+    tuts = tuts.order_by("-date", "-id")
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        tuts = tuts.filter(Q(date__lt=last_date) | Q(date=last_date, id__lt=last_id))
+    return tuts
+
+
+def keyset_split(rows, page_size):
+    """Returns (page, cursor of the next page or None) of page_size + 1 fetched rows"""
+    if len(rows) > page_size:
+        return rows[:page_size], encode_cursor(rows[page_size - 1])
+    return rows, None
+
+
+def keyset_page(tuts, cursor, page_size):
+    """Returns (Tutorings of the page, cursor of the next page or None), newest first"""
+    return keyset_split(list(keyset_query(tuts, cursor)[: page_size + 1]), page_size)
@@ -23,6 +23,7 @@ class TutoringSerializer(serializers.ModelSerializer):
         representation["subject"] = instance.subject.serialize()
         representation["teacher"] = instance.teacher.serialize()
         representation["student"] = instance.student.serialize()
+        representation["pdf"] = instance.pdf_endpoint
         return representation
 
 
@@ -59,6 +60,11 @@ class TutoringApiSerializer(serializers.ModelSerializer):
         model = Tutoring
         fields = "__all__"
 
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        representation["pdf"] = instance.pdf_endpoint
+        return representation
+
     def validate_date(self, value):
         # Check if valid format
         try:
@@ -93,3 +99,92 @@ class TutoringApiSerializer(serializers.ModelSerializer):
         if not value.name.endswith(".pdf"):
             raise serializers.ValidationError("File must be a PDF.")
         return value
+
+
+def validate_bulk_tutorings(items):
+    """Validates Tutorings POSTed as a list to TutoringView, resolving all subjects and
+    usernames with one query each
+
+    Returns:
+        (list, dict): unsaved Tutorings, {index: {field: error}} of the invalid items
+    """
+    fields = [
+        "subject_title",
+        "teacher_username",
+        "student_username",
+        "yyyy_mm_dd",
+        "duration_in_min",
+    ]
+    validator = TutoringApiSerializer()
+    items = [item if isinstance(item, dict) else {} for item in items]
+
+    usernames = {item.get(f"{role}_username") for item in items for role in ["teacher", "student"]}
+    users = User.objects.filter(username__in=usernames - {None}).prefetch_related("groups")
+    users = {user.username: user for user in users}
+    titles = {str(item["subject_title"]) for item in items if item.get("subject_title") is not None}
+    subjects = Subject.objects.in_bulk(titles, field_name="title")
+
+    tutorings, errors = [], {}
+    for index, item in enumerate(items):
+        item_errors = {
+            field: "This field is required." for field in fields if item.get(field) is None
+        }
+        if item_errors:
+            errors[index] = item_errors
+            continue
+
+        title = str(item["subject_title"])
+        teacher = users.get(item["teacher_username"])
+        student = users.get(item["student_username"])
+        if len(title) > Subject._meta.get_field("title").max_length:
+            item_errors["subject_title"] = "Subject title too long."
+        # same role check as Tutoring.clean, which create_many runs
+        if teacher is None or teacher.role != "Teacher":
+            item_errors["teacher_username"] = "Teacher does not exist."
+        if student is None or student.role != "Student":
+            item_errors["student_username"] = "Student does not exist."
+        try:
+            validator.validate_date(item["yyyy_mm_dd"])
+        except serializers.ValidationError as e:
+            item_errors["yyyy_mm_dd"] = e.detail["date"]
+        try:
+            validator.validate_duration(int(item["duration_in_min"]))
+        except (TypeError, ValueError):
+            item_errors["duration_in_min"] = "Duration must be an integer."
+        except serializers.ValidationError as e:
+            item_errors["duration_in_min"] = e.detail["duration"]
+        if not isinstance(item.get("paid", False), bool):
+            item_errors["paid"] = "paid must be boolean"
+
+        if item_errors:
+            errors[index] = item_errors
+            continue
+
+        # Subject created only when saving, see save_bulk_tutorings
+        tutorings.append(
+            Tutoring(
+                date=datetime.strptime(str(item["yyyy_mm_dd"]), "%Y-%m-%d").date(),
+                duration=int(item["duration_in_min"]),
+                subject=subjects.get(title) or Subject(title=title),
+                teacher=teacher,
+                student=student,
+                content=str(item.get("content", "")),
+                paid=item.get("paid", False),
+            )
+        )
+    return tutorings, errors
+
+
+def save_bulk_tutorings(tutorings):
+    """Saves Tutorings from validate_bulk_tutorings (and their new Subjects); call in a transaction"""
+    new_titles = {tut.subject.title for tut in tutorings if tut.subject.pk is None}
+    if new_titles:
+        Subject.objects.bulk_create(
+            [Subject(title=title) for title in new_titles], ignore_conflicts=True
+        )
+        subjects = Subject.objects.in_bulk(new_titles, field_name="title")
+        for tut in tutorings:
+            if tut.subject.pk is None:
+                tut.subject = subjects[tut.subject.title]
+
+    return Tutoring.objects.create_many(tutorings)
@@ -0,0 +1,170 @@
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+
+from checkweb.models import Subject, Tutoring, User
+
+
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()  # cached responses outlive the rolled back DB
+        self.client = AsyncClient()
+
+        self.nico = User.objects.create_user(
+            "nico.st", "nico.st@mail.de", "password", first_name="Nico", last_name="St"
+        )
+        self.nico.groups.set([Group.objects.get(name="Teacher")])
+        self.kat = User.objects.create_user(
+            "kat.ev", "kat.ev@web.de", "password", first_name="Katniss", last_name="Everdeen"
+        )
+        self.kat.preis_pro_45 = 30
+        self.kat.save()
+
+        self.tut = Tutoring.objects.create(
+            date="2022-01-01",
+            duration=45,
+            subject=Subject.objects.get(title="Math"),
+            student=self.kat,
+            teacher=self.nico,
+            content="Satz des Pythagoras",
+        )
+
+        self.as_nico = {"authorization": f"Token {Token.objects.get(user=self.nico).key}"}
+        self.as_kat = {"authorization": f"Token {Token.objects.get(user=self.kat).key}"}
+
+    async def test_tutoring(self):
+        url = reverse("api:async_tutoring", args=[self.tut.id])
+        resp_unauthorized = await self.client.get(url)
+        resp_as_student = await self.client.get(url, headers=self.as_kat)
+        resp = await self.client.get(url, headers=self.as_nico)
+        resp_list = await self.client.get(reverse("api:async_tutoring"), headers=self.as_kat)
+
+        # TEST same permissions and answers as TutoringView
+        self.assertEqual(resp_unauthorized.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(resp_as_student.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(resp.json()["content"], "Satz des Pythagoras")
+        self.assertEqual(resp.json()["price"], 30)
+        self.assertEqual([tut["id"] for tut in resp_list.json()["results"]], [self.tut.id])
+
+    async def test_update_delete(self):
+        url = reverse("api:async_tutoring", args=[self.tut.id])
+        resp_put_as_student = await self.client.put(
+            url,
+            {"new_values": {"content": "Sinussatz"}},
+            content_type="application/json",
+            headers=self.as_kat,
+        )
+        resp_put = await self.client.put(
+            url,
+            {"new_values": {"content": "Sinussatz"}},
+            content_type="application/json",
+            headers=self.as_nico,
+        )
+
+        # TEST same permissions and answers as TutoringView PUT
+        self.assertEqual(resp_put_as_student.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(resp_put.json()["new"]["content"], "Sinussatz")
+        self.assertEqual((await Tutoring.objects.aget(id=self.tut.id)).content, "Sinussatz")
+
+        # TEST as TutoringView DELETE
+        resp_delete_as_student = await self.client.delete(url, headers=self.as_kat)
+        resp_delete = await self.client.delete(url, headers=self.as_nico)
+        self.assertEqual(resp_delete_as_student.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(resp_delete.status_code, status.HTTP_200_OK)
+        self.assertFalse(await Tutoring.objects.filter(id=self.tut.id).aexists())
+
+    async def test_create(self):
+        tut = {
+            "subject_title": "Math",
+            "teacher_username": "nico.st",
+            "student_username": "kat.ev",
+            "yyyy_mm_dd": "2022-02-01",
+            "duration_in_min": 60,
+            "content": "Sinussatz",
+        }
+        resp_invalid = await self.client.post(
+            reverse("api:async_tutoring"),
+            {**tut, "duration_in_min": 0},
+            content_type="application/json",
+            headers=self.as_nico,
+        )
+        resp_with_pdf = await self.client.post(
+            reverse("api:async_tutoring"),
+            {**tut, "pdf": SimpleUploadedFile("aloha.pdf", b"PDF", content_type="application/pdf")},
+            headers=self.as_nico,
+        )
+
+        # TEST invalid: not created
+        self.assertEqual(resp_invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # TEST valid with PDF: created and stored
+        self.assertEqual(resp_with_pdf.status_code, status.HTTP_201_CREATED)
+        created = await Tutoring.objects.aget(id=resp_with_pdf.json()["id"])
+        self.assertEqual(created.pdf_status, "pending")
+        self.assertTrue(await sync_to_async(created.pdf.storage.exists)(created.pdf.name))
+
+        # prevent PDF from keeping in Storage
+        await sync_to_async(created.pdf.storage.delete)(created.pdf.name)
+
+        # TEST list: all created in one go, as TutoringView
+        resp_many = await self.client.post(
+            reverse("api:async_tutoring"),
+            [tut, {**tut, "yyyy_mm_dd": "2022-02-02"}],
+            content_type="application/json",
+            headers=self.as_nico,
+        )
+        self.assertEqual(resp_many.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(resp_many.json()["created"]), 2)
+
+    async def test_tuts_per_month_and_users(self):
+        resp_month = await self.client.get(
+            reverse("api:async_tuts_per_month", args=["kat.ev", "2022", "01"]), headers=self.as_kat
+        )
+        resp_summary = await self.client.get(
+            reverse("api:async_tuts_per_month", args=["kat.ev"]),
+            {"summary": "true"},
+            headers=self.as_nico,
+        )
+        resp_users_as_student = await self.client.get(
+            reverse("api:async_user"), headers=self.as_kat
+        )
+        resp_users = await self.client.get(reverse("api:async_user"), headers=self.as_nico)
+
+        # TEST same answers as TutsPerMonthView, UserView
+        self.assertEqual(resp_month.json()["sum_all"], 30)
+        self.assertEqual(resp_summary.json()["2022-01"]["count"], 1)
+        self.assertEqual(resp_users_as_student.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue({"nico.st", "kat.ev"} <= {user["username"] for user in resp_users.json()})
+        self.assertIn("ETag", resp_users)
+
+    async def test_settle_and_user(self):
+        resp_settle = await self.client.post(
+            reverse("api:async_tuts_per_month", args=["kat.ev"]),
+            {"paid": True, "year": 2022, "month": 1},
+            content_type="application/json",
+            headers=self.as_nico,
+        )
+        resp_user = await self.client.get(
+            reverse("api:async_user", args=["kat.ev"]), headers=self.as_nico
+        )
+        resp_missing = await self.client.get(
+            reverse("api:async_user", args=["xavier.x"]), headers=self.as_nico
+        )
+
+        # TEST same answers as TutsPerMonthView POST, UserView with username
+        self.assertEqual(resp_settle.status_code, status.HTTP_200_OK)
+        self.assertTrue((await Tutoring.objects.aget(id=self.tut.id)).paid)
+        self.assertEqual(resp_user.json()["group"], "Student")
+        self.assertEqual(resp_missing.status_code, status.HTTP_404_NOT_FOUND)
+
+        resp_delete = await self.client.delete(
+            reverse("api:async_user", args=["kat.ev"]), headers=self.as_nico
+        )
+        self.assertEqual(resp_delete.status_code, status.HTTP_200_OK)
+        self.assertFalse(await User.objects.filter(username="kat.ev").aexists())
@@ -2,9 +2,10 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -12,11 +13,14 @@ import os
 import json
 
 from checkweb.models import Subject, Tutoring, User
+from rest_framework.authtoken.models import Token
+from ..authentication import token_cache
 from ..serializers import SubjectSerializer
 
 
 class SimpleRequestsTests(TestCase):
     def setUp(self):
+        cache.clear()  # cached responses outlive the rolled back DB
         self.client = APIClient()
         self.subject_data = {"title": "Test Subject"}
         self.teach = Group.objects.get(name="Teacher")
@@ -30,6 +34,18 @@ class SimpleRequestsTests(TestCase):
         response = self.client.get(reverse("api:subject"))
         self.assertEqual(response.status_code, 200)
 
+        # TEST repeated: 304 via ETag without DB; invalidated by a new Subject
+        with self.assertNumQueries(0):
+            response_not_modified = self.client.get(
+                reverse("api:subject"), HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response_not_modified.status_code, 304)
+
+        Subject.objects.create(title="Test Subject")
+        response_new = self.client.get(reverse("api:subject"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response_new.status_code, 200)
+        self.assertIn("Test Subject", [subject["title"] for subject in response_new.json()])
+
     def test_add_subject(self):
         self.n_subjects = Subject.objects.all().count()
         response = self.client.post(reverse("api:subject"), self.subject_data, format="json")
@@ -139,3 +155,49 @@ class TutsPerMonthViewTests(TestCase):
     def test_sum_unauthenticated(self):
         response = self.client.get(reverse("api:tuts_per_month", args=("kat.ev", 2022, 1)))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_CACHE_TTL=300)
+    def test_token_authentication_cached(self):
+        token_cache.clear()
+        self.nico.groups.set([self.teach])
+        token = Token.objects.get(user=self.nico)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get(reverse("api:user"))
+
+        # TEST repeated on cached endpoint: no queries at all
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("api:user"))
+        self.assertEqual(response.status_code, 200)
+
+        # TEST unrelated change of the user (as last_login on each login): still authenticated
+        # from the cache, only the user list is rebuilt
+        self.nico.last_login = timezone.now()
+        self.nico.save()
+        with self.assertNumQueries(2):  # users with groups
+            self.client.get(reverse("api:user"))
+
+        # TEST groups changed: new role applies
+        self.nico.groups.set([Group.objects.get(name="Student")])
+        self.assertEqual(self.client.get(reverse("api:user")).status_code, 403)
+
+        # TEST token deleted: unauthorized
+        token.delete()
+        self.assertEqual(self.client.get(reverse("api:user")).status_code, 401)
+
+    def test_token_authentication_deactivated(self):
+        token = Token.objects.get(user=self.nico)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        with self.settings(TOKEN_CACHE_TTL=300):
+            self.assertEqual(self.client.get(reverse("api:user")).status_code, 200)
+
+            # TEST deactivated user: unauthorized at once
+            self.nico.is_active = False
+            self.nico.save()
+            self.assertEqual(self.client.get(reverse("api:user")).status_code, 401)
+
+        # TEST not cached without a shared cache (the default then)
+        self.nico.is_active = True
+        self.nico.save()
+        self.client.get(reverse("api:user"))
+        with self.assertNumQueries(2):  # token with user, groups
+            self.client.get(reverse("api:user"))
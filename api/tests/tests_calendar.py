@@ -0,0 +1,109 @@
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from django.urls import reverse
+
+from checkweb.models import FeedToken, Subject, Tutoring, User
+
+
+class CalendarTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:calendar")
+
+        self.nico = User.objects.create_user(
+            "nico.st", "nico.st@mail.de", "password", first_name="Nico", last_name="St"
+        )
+        self.nico.groups.set([Group.objects.get(name="Teacher")])
+        self.api_token = Token.objects.get(user=self.nico).key
+        self.token = FeedToken.rotate(self.nico).key
+
+        self.kat = User.objects.create_user(
+            "kat.ev", "kat.ev@web.de", "password", first_name="Katniss", last_name="Everdeen"
+        )
+
+        self.tut = Tutoring.objects.create(
+            date="2022-01-01",
+            duration=45,
+            subject=Subject.objects.get(title="Math"),
+            student=self.kat,
+            teacher=self.nico,
+            content="Satz des Pythagoras",
+        )
+
+    def test_feed(self):
+        resp_wrong_token = self.client.get(self.url, {"token": "wrongtoken"})
+        resp = self.client.get(self.url, {"token": self.token})
+        ics = b"".join(resp.streaming_content).decode()
+
+        # TEST wrong token: unauthorized
+        self.assertEqual(resp_wrong_token.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # TEST one event per Tutoring
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp["Content-Type"].startswith("text/calendar"))
+        self.assertTrue(ics.startswith("BEGIN:VCALENDAR"))
+        self.assertEqual(ics.count("BEGIN:VEVENT"), 1)
+        self.assertIn(f"UID:tutoring-{self.tut.id}@checkmathe", ics)
+        self.assertIn("DTSTART;VALUE=DATE:20220101", ics)
+        self.assertIn("SUMMARY:Math: kat.ev with nico.st", ics)
+
+    def test_conditional_requests(self):
+        resp = self.client.get(self.url, {"token": self.token})
+        etag = resp["ETag"]
+
+        # TEST unchanged: 304 via ETag and via Last-Modified
+        resp_etag = self.client.get(self.url, {"token": self.token}, HTTP_IF_NONE_MATCH=etag)
+        resp_since = self.client.get(
+            self.url, {"token": self.token}, HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"]
+        )
+        self.assertEqual(resp_etag.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp_since.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # TEST changed (also in bulk) or deleted: new feed
+        Tutoring.objects.filter(id=self.tut.id).settle(True)
+        resp_settled = self.client.get(self.url, {"token": self.token}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp_settled.status_code, status.HTTP_200_OK)
+
+        # TEST renamed subject (in the events' summary): new feed
+        etag = resp_settled["ETag"]
+        subject = Subject.objects.get(title="Math")
+        subject.title = "Mathe"
+        subject.save()
+        resp_renamed = self.client.get(self.url, {"token": self.token}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp_renamed.status_code, status.HTTP_200_OK)
+
+        etag = resp_renamed["ETag"]
+        self.tut.delete()
+        resp_deleted = self.client.get(self.url, {"token": self.token}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp_deleted.status_code, status.HTTP_200_OK)
+        self.assertNotIn(b"BEGIN:VEVENT", b"".join(resp_deleted.streaming_content))
+
+    def test_feed_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.api_token}")
+        resp_url = self.client.get(reverse("api:calendar_token"))
+        self.client.credentials()
+
+        # TEST feed URL with the feed token, not the API token
+        self.assertEqual(resp_url.data["url"], f"http://testserver{self.url}?token={self.token}")
+        resp_api_token = self.client.get(self.url, {"token": self.api_token})
+        self.assertEqual(resp_api_token.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # TEST feed token only for the feed
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.assertEqual(self.client.get(reverse("api:user")).status_code, 401)
+        self.client.credentials()
+        resp_user = self.client.get(reverse("api:user"), {"token": self.token})
+        self.assertEqual(resp_user.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # TEST rotated: old feed URL stops working
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.api_token}")
+        resp_rotated = self.client.post(reverse("api:calendar_token"))
+        self.client.credentials()
+        self.assertEqual(resp_rotated.status_code, status.HTTP_201_CREATED)
+        resp_old = self.client.get(self.url, {"token": self.token})
+        self.assertEqual(resp_old.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(resp_rotated.data["url"]).status_code, 200)
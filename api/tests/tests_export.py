@@ -0,0 +1,83 @@
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from django.urls import reverse
+
+from checkweb.models import Subject, Tutoring, User
+import csv
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:export")
+
+        self.nico = User.objects.create_user(
+            "nico.st", "nico.st@mail.de", "password", first_name="Nico", last_name="St"
+        )
+        self.nico.groups.set([Group.objects.get(name="Teacher")])
+        self.kat = User.objects.create_user(
+            "kat.ev", "kat.ev@web.de", "password", first_name="Katniss", last_name="Everdeen"
+        )
+        self.kat.groups.set([Group.objects.get(name="Student")])
+        self.kat.preis_pro_45 = 30
+        self.kat.save()
+
+        math = Subject.objects.get(title="Math")
+        for day, duration, paid in [("2022-12-31", 45, True), ("2023-01-02", 60, False)]:
+            Tutoring.objects.create(
+                date=day,
+                duration=duration,
+                subject=math,
+                student=self.kat,
+                teacher=self.nico,
+                content="Satz des Pythagoras, Seite 3",
+                paid=paid,
+            )
+
+    def export(self, **params):
+        resp = self.client.get(self.url, params)
+        return resp, list(csv.reader(b"".join(resp.streaming_content).decode().splitlines()))
+
+    def test_export(self):
+        self.client.force_authenticate(user=self.nico)
+        resp, rows = self.export()
+        resp_year, rows_year = self.export(year=2023)
+
+        # TEST streamed CSV with header, price and paid status
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.streaming)
+        self.assertTrue(resp["Content-Type"].startswith("text/csv"))
+        self.assertEqual(
+            rows[0], ["date", "student", "subject", "duration", "content", "price", "paid"]
+        )
+        self.assertEqual(
+            rows[1],
+            ["2022-12-31", "kat.ev", "Math", "45", "Satz des Pythagoras, Seite 3", "30.0", "True"],
+        )
+
+        # TEST filtered by year
+        self.assertEqual(len(rows_year), 2)
+        self.assertEqual(rows_year[1][0], "2023-01-02")
+        self.assertEqual(rows_year[1][5:], ["40.0", "False"])
+
+        # TEST filename of the parsed year
+        self.assertIn('filename="tutorings_all.csv"', resp["Content-Disposition"])
+        self.assertIn('filename="tutorings_2023.csv"', resp_year["Content-Disposition"])
+        for year in ["", " 2023"]:
+            resp = self.client.get(self.url, {"year": year})
+            self.assertNotIn(" 2023", resp["Content-Disposition"])
+            self.assertNotIn("tutorings_.csv", resp["Content-Disposition"])
+
+    def test_export_illegal(self):
+        # TEST only teachers
+        self.client.force_authenticate(user=self.kat)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        # TEST invalid year
+        self.client.force_authenticate(user=self.nico)
+        self.assertEqual(
+            self.client.get(self.url, {"year": "abc"}).status_code, status.HTTP_400_BAD_REQUEST
+        )
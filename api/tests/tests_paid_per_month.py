@@ -5,6 +5,8 @@ from django.contrib.auth.models import Group
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, NoReverseMatch
 from django.utils import timezone
 
@@ -234,3 +236,161 @@ class TutsPerMonthTests(TestCase):
         self.assertEqual(resp_all_paid.json().get("is_paid"), False)
         self.assertEqual(len(resp_all_paid.json().get("tuts_paid")), 2)
         self.assertEqual(len(resp_all_paid.json().get("tuts_unpaid")), 1)
+
+    def test_get_all_months(self):
+        resp = self.client.get(
+            reverse("api:tuts_per_month", kwargs={"student_username": "kat.ev"}),
+        )
+
+        # TEST grouped by month: Jan with 3 tuts (45 + 30 + 30), Feb with 1 tut
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(resp.json().keys()), ["2022-01", "2022-02"])
+
+        jan = resp.json()["2022-01"]
+        self.assertEqual(len(jan["tuts_all"]), 3)
+        self.assertEqual(len(jan["tuts_unpaid"]), 3)
+        self.assertEqual(jan["tuts_paid"], [])
+        self.assertEqual(jan["sum_all"], 105)
+        self.assertEqual(jan["sum_paid"], 0)
+        self.assertEqual(jan["sum_unpaid"], 105)
+        self.assertEqual(jan["is_paid"], False)
+
+        # TEST paid tuts land in the paid partition of their month only
+        self.tutoring_nico_future.paid = True
+        self.tutoring_nico_future.save()
+        feb = self.client.get(
+            reverse("api:tuts_per_month", kwargs={"student_username": "kat.ev"}),
+        ).json()["2022-02"]
+        self.assertEqual(len(feb["tuts_paid"]), 1)
+        self.assertEqual(feb["tuts_unpaid"], [])
+        self.assertEqual(feb["sum_paid"], 30)
+        self.assertEqual(feb["is_paid"], True)
+
+    def test_get_query_count(self):
+        url = reverse("api:tuts_per_month", kwargs={"student_username": "kat.ev"})
+
+        with CaptureQueriesContext(connection) as few_months:
+            self.client.get(url)
+
+        for month in range(3, 13):
+            Tutoring.objects.create(
+                date=f"2022-{month:02d}-01",
+                duration=45,
+                subject=self.math,
+                student=self.kat,
+                teacher=self.nico,
+                content="Lorem ipsum",
+            )
+
+        with CaptureQueriesContext(connection) as many_months:
+            resp = self.client.get(url)
+
+        # TEST number of queries does not grow with the number of months
+        self.assertEqual(len(resp.json()), 12)
+        self.assertEqual(len(few_months), len(many_months))
+        self.assertEqual(len(many_months), 2)  # student, Tutorings (role cached on the user)
+
+    def test_get_summary(self):
+        self.tutoring_nico1.paid = True
+        self.tutoring_nico1.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(
+                reverse("api:tuts_per_month", kwargs={"student_username": "kat.ev"}),
+                {"summary": "true"},
+            )
+
+        # TEST only sums per month, aggregated in the DB
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            resp.json(),
+            {
+                "2022-01": {
+                    "count": 3,
+                    "sum_all": 105,
+                    "sum_paid": 45,
+                    "sum_unpaid": 60,
+                    "is_paid": False,
+                },
+                "2022-02": {
+                    "count": 1,
+                    "sum_all": 30,
+                    "sum_paid": 0,
+                    "sum_unpaid": 30,
+                    "is_paid": False,
+                },
+            },
+        )
+        self.assertEqual(len(queries), 2)  # student, summary (role cached on the user)
+
+        resp_month = self.client.get(
+            reverse(
+                "api:tuts_per_month",
+                kwargs={"student_username": "kat.ev", "year": 2022, "month": 2},
+            ),
+            {"summary": "true"},
+        )
+
+        # TEST specific month: only that month
+        self.assertEqual(list(resp_month.json().keys()), ["2022-02"])
+
+    def test_post_paid_single_update(self):
+        url = reverse("api:tuts_per_month", kwargs={"student_username": "kat.ev"})
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(url, {"year": 2022, "month": 1, "paid": True}, format="json")
+
+        # TEST one UPDATE for all Tutorings, no per-row save
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.json()["new"]), 2)
+        self.assertTrue(all(tut["paid"] for tut in resp.json()["new"]))
+        updates = [q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+
+    def test_settle_multiple_months(self):
+        url = reverse("api:settle")
+
+        resp_invalid = self.client.post(
+            url, {"paid": True, "months": [["kat.ev", 2022]]}, format="json"
+        )
+
+        # TEST invalid months: not changed
+        self.assertEqual(resp_invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tutoring.objects.filter(paid=True).exists())
+
+        resp = self.client.post(
+            url,
+            {"paid": True, "months": [["kat.ev", 2022, 1], ["kat.ev", 2022, 2]]},
+            format="json",
+        )
+
+        # TEST all of nico's tuts in both months paid, xavier not touched
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.json()["new"]), 3)
+        self.assertFalse(Tutoring.objects.filter(teacher=self.nico, paid=False).exists())
+        self.assertEqual(Tutoring.objects.get(teacher=self.xavier).paid, False)
+
+        # TEST student may not settle
+        self.client.force_authenticate(user=self.kat)
+        resp_student = self.client.post(
+            url, {"paid": False, "months": [["kat.ev", 2022, 1]]}, format="json"
+        )
+        self.assertEqual(resp_student.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_month(self):
+        resp_get = self.client.get(
+            reverse(
+                "api:tuts_per_month",
+                kwargs={"student_username": "kat.ev", "year": 2022, "month": 13},
+            ),
+        )
+        resp_post = self.client.post(
+            reverse("api:tuts_per_month", kwargs={"student_username": "kat.ev"}),
+            {"year": 2022, "month": 13, "paid": True},
+            format="json",
+        )
+
+        # TEST invalid month: rejected, not changed
+        self.assertEqual(resp_get.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp_post.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tutoring.objects.filter(paid=True).exists())
@@ -0,0 +1,259 @@
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from django.contrib.auth.models import Group
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from PyPDF2 import PdfWriter
+from storages.backends.s3boto3 import S3Boto3Storage
+import base64
+import io
+import json
+import os
+import time
+
+from checkweb.models import Subject, Tutoring, User
+from checkweb.presigned import has_pdf_header, unsign, upload_url
+
+
+@override_settings(PDF_WORKERS=0)
+class PresignedPdfTests(TestCase):
+    def setUp(self):
+        self.nico = User.objects.create_user(
+            "nico.st", "nico.st@mail.de", "password", first_name="Nico", last_name="St"
+        )
+        self.nico.groups.set([Group.objects.get(name="Teacher")])
+        self.kat = User.objects.create_user(
+            "kat.ev", "kat.ev@web.de", "password", first_name="Katniss", last_name="Everdeen"
+        )
+        self.tut = Tutoring.objects.create(
+            date="2022-01-01",
+            duration=45,
+            subject=Subject.objects.get(title="Math"),
+            student=self.kat,
+            teacher=self.nico,
+            content="Satz des Pythagoras",
+        )
+
+        writer = PdfWriter()
+        writer.add_blank_page(width=595, height=842)
+        pdf = io.BytesIO()
+        writer.write(pdf)
+        self.pdf = pdf.getvalue()
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.nico)
+        self.storage_client = Client()  # as the storage, without API credentials
+
+    def post_file(self, upload, content):
+        """POSTs content to the upload's presigned URL as multipart form, as to S3"""
+        file = SimpleUploadedFile("upload.pdf", content, content_type="application/pdf")
+        return self.storage_client.post(upload["url"], {**upload["fields"], "file": file})
+
+    def upload(self, tut, content=None):
+        """Uploads self.pdf (or content) for the tut via a presigned URL, returns the "upload"
+        to confirm"""
+        resp = self.client.post(reverse("api:tutoring_pdf_upload", args=[tut.id]))
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["method"], "POST")
+
+        resp_post = self.post_file(resp.data, self.pdf if content is None else content)
+        self.assertEqual(resp_post.status_code, 204)
+        return resp.data
+
+    def test_upload_confirm_download(self):
+        confirm_url = reverse("api:tutoring_pdf_confirm", args=[self.tut.id])
+
+        # TEST upload URL only for the teacher of the tut
+        self.client.force_authenticate(user=self.kat)
+        resp_as_student = self.client.post(reverse("api:tutoring_pdf_upload", args=[self.tut.id]))
+        self.assertEqual(resp_as_student.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.nico)
+
+        # TEST confirming before uploading fails
+        resp = self.client.post(reverse("api:tutoring_pdf_upload", args=[self.tut.id]))
+        resp_early = self.client.post(confirm_url, {"upload": resp.data["upload"]}, format="json")
+        self.assertEqual(resp_early.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # TEST the PDF is posted to the storage directly, attached on confirm and processed
+        upload = self.upload(self.tut)
+        resp_post_again = self.post_file(upload, self.pdf)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp_confirm = self.client.post(
+                confirm_url, {"upload": upload["upload"]}, format="json"
+            )
+        self.assertEqual(resp_post_again.status_code, 409)
+        self.assertEqual(resp_confirm.status_code, status.HTTP_200_OK)
+        tut = Tutoring.objects.get(id=self.tut.id)
+        self.assertTrue(tut.pdf.name.startswith("pdfs/"))
+        self.assertEqual(tut.pdf_status, "valid")
+        self.assertEqual(tut.pdf_pages, 1)
+
+        # TEST download via a presigned URL, only valid for GET
+        resp_download = self.client.get(reverse("api:tutoring_pdf", args=[self.tut.id]))
+        self.assertEqual(resp_download.status_code, status.HTTP_200_OK)
+        resp_file = self.storage_client.get(resp_download.data["url"])
+        resp_post_to_download = self.post_file(
+            {"url": resp_download.data["url"], "fields": {}}, b"other"
+        )
+        self.assertEqual(resp_file.status_code, 200)
+        self.assertEqual(b"".join(resp_file.streaming_content), self.pdf)
+        self.assertEqual(resp_post_to_download.status_code, 405)
+
+        # TEST a new upload replaces the old PDF once committed
+        old_name, storage = tut.pdf.name, tut.pdf.storage
+        upload = self.upload(self.tut)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(confirm_url, {"upload": upload["upload"]}, format="json")
+        self.assertFalse(storage.exists(old_name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tutoring.objects.get(id=self.tut.id).delete()
+
+    def test_invalid_uploads(self):
+        other = Tutoring.objects.create(
+            date="2022-01-02",
+            duration=45,
+            subject=Subject.objects.get(title="Math"),
+            student=self.kat,
+            teacher=self.nico,
+            content="Sinussatz",
+        )
+        upload = self.upload(other)
+        confirm_url = reverse("api:tutoring_pdf_confirm", args=[self.tut.id])
+
+        resp_tampered = self.client.post(
+            confirm_url, {"upload": upload["upload"] + "x"}, format="json"
+        )
+        resp_other_tut = self.client.post(confirm_url, {"upload": upload["upload"]}, format="json")
+        resp_bad_url = self.post_file({**upload, "url": upload["url"] + "x"}, self.pdf)
+        resp_no_pdf = self.client.get(reverse("api:tutoring_pdf", args=[self.tut.id]))
+
+        # TEST uploads only attach to the tut they were issued for, with intact signatures
+        self.assertEqual(resp_tampered.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp_other_tut.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp_bad_url.status_code, 403)
+        self.assertEqual(resp_no_pdf.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Tutoring.objects.get(id=self.tut.id).pdf)
+
+        # the unconfirmed upload
+        Tutoring._meta.get_field("pdf").storage.delete(unsign(upload["upload"], None)["name"])
+
+    @override_settings(PDF_MAX_SIZE=1024)
+    def test_upload_limits(self):
+        storage = Tutoring._meta.get_field("pdf").storage
+        confirm_url = reverse("api:tutoring_pdf_confirm", args=[self.tut.id])
+        resp = self.client.post(reverse("api:tutoring_pdf_upload", args=[self.tut.id]))
+        upload = resp.data
+        name = unsign(upload["upload"], None)["name"]
+
+        resp_too_large = self.post_file(upload, b"%PDF-" + b"0" * 1024)
+        resp_no_length = self.storage_client.generic(
+            "POST", upload["url"], b"", "application/pdf", CONTENT_LENGTH=""
+        )
+        resp_no_file = self.storage_client.post(upload["url"], upload["fields"])
+
+        # TEST the stand-in refuses uploads without or over the size, as S3 does
+        self.assertEqual(upload["max_size"], 1024)
+        self.assertEqual(resp_too_large.status_code, 413)
+        self.assertEqual(resp_no_length.status_code, 411)
+        self.assertEqual(resp_no_file.status_code, 400)
+        self.assertFalse(storage.exists(name))
+
+        # TEST confirming a file that is no PDF: refused and deleted
+        self.assertEqual(self.post_file(upload, b"<html></html>").status_code, 204)
+        resp_no_pdf = self.client.post(confirm_url, {"upload": upload["upload"]}, format="json")
+        self.assertEqual(resp_no_pdf.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(Tutoring.objects.get(id=self.tut.id).pdf)
+
+    def test_s3(self):
+        storage = S3Boto3Storage(
+            bucket_name="checkmathe",
+            access_key="key",
+            secret_key="secret",
+            region_name="eu-central-1",
+        )
+        client = storage.bucket.meta.client
+
+        # TEST presigned POST bounded by PDF_MAX_SIZE (signed locally, no request to S3)
+        upload = upload_url(storage, "pdfs/aloha.pdf", None)
+        policy = json.loads(base64.b64decode(upload["fields"]["policy"]))
+        self.assertEqual(upload["method"], "POST")
+        self.assertEqual(upload["fields"]["key"], "pdfs/aloha.pdf")
+        self.assertIn(["content-length-range", 1, upload["max_size"]], policy["conditions"])
+
+        # TEST only the first bytes are fetched to check the PDF header
+        with Stubber(client) as stubber:
+            for content in (self.pdf[:5], b"<html"):
+                stubber.add_response(
+                    "get_object",
+                    {"Body": StreamingBody(io.BytesIO(content), len(content))},
+                    {"Bucket": "checkmathe", "Key": "pdfs/aloha.pdf", "Range": "bytes=0-4"},
+                )
+            self.assertTrue(has_pdf_header(storage, "pdfs/aloha.pdf"))
+            self.assertFalse(has_pdf_header(storage, "pdfs/aloha.pdf"))
+
+    def test_delete_orphaned_pdfs(self):
+        storage = Tutoring._meta.get_field("pdf").storage
+        upload = self.upload(self.tut)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("api:tutoring_pdf_confirm", args=[self.tut.id]),
+                {"upload": upload["upload"]},
+                format="json",
+            )
+        orphan = unsign(self.upload(self.tut)["upload"], None)["name"]
+        recent = unsign(self.upload(self.tut)["upload"], None)["name"]
+        an_hour_ago = time.time() - 3600
+        for name in (orphan, Tutoring.objects.get(id=self.tut.id).pdf.name):
+            os.utime(storage.path(name), (an_hour_ago, an_hour_ago))
+
+        call_command("delete_orphaned_pdfs", "--older-than", "30", stdout=io.StringIO())
+
+        # TEST only unconfirmed uploads older than given deleted
+        self.assertFalse(storage.exists(orphan))
+        self.assertTrue(storage.exists(recent))
+        self.assertTrue(storage.exists(Tutoring.objects.get(id=self.tut.id).pdf.name))
+
+        # TEST uploads that can still be confirmed are kept
+        with self.assertRaises(CommandError):
+            call_command("delete_orphaned_pdfs", "--older-than", "1")
+
+        storage.delete(recent)
+        with self.captureOnCommitCallbacks(execute=True):
+            Tutoring.objects.get(id=self.tut.id).delete()
+
+    def test_web_download(self):
+        upload = self.upload(self.tut)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("api:tutoring_pdf_confirm", args=[self.tut.id]),
+                {"upload": upload["upload"]},
+                format="json",
+            )
+        url = reverse("checkweb:tutoring_pdf", args=[self.tut.id])
+
+        # TEST participants are redirected to a presigned URL, others not
+        web = Client()
+        web.force_login(self.kat)
+        resp = web.get(url)
+        web.force_login(
+            User.objects.create_user(
+                "xavier.x", "xavier.x@mail.de", "password", first_name="Xavier", last_name="X"
+            )
+        )
+        resp_other = web.get(url)
+        resp_file = self.storage_client.get(resp.url)
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(b"".join(resp_file.streaming_content), self.pdf)
+        self.assertEqual(resp_other.status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tutoring.objects.get(id=self.tut.id).delete()
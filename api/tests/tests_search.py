@@ -0,0 +1,118 @@
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from checkweb.models import Subject, Tutoring, User
+from checkweb.search import FTS_TABLE, create_fts_triggers, missing_fts_triggers
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:search")
+
+        teacher = Group.objects.get(name="Teacher")
+        self.nico = User.objects.create_user(
+            "nico.st", "nico.st@mail.de", "password", first_name="Nico", last_name="St"
+        )
+        self.nico.groups.set([teacher])
+        self.other = User.objects.create_user(
+            "other.te", "other.te@mail.de", "password", first_name="Other", last_name="Te"
+        )
+        self.other.groups.set([teacher])
+        self.kat = User.objects.create_user(
+            "kat.ev", "kat.ev@web.de", "password", first_name="Katniss", last_name="Everdeen"
+        )
+
+        math = Subject.objects.get(title="Math")
+        self.tut_content = Tutoring.objects.create(
+            date="2022-01-01",
+            duration=45,
+            subject=math,
+            student=self.kat,
+            teacher=self.nico,
+            content="Satz des Pythagoras, Pythagoras am Dreieck",
+        )
+        self.tut_pdf = Tutoring.objects.create(
+            date="2022-01-08",
+            duration=45,
+            subject=math,
+            student=self.kat,
+            teacher=self.nico,
+            content="Hausaufgaben besprochen",
+        )
+        # as if extracted from an uploaded PDF
+        Tutoring.objects.filter(id=self.tut_pdf.id).update(pdf_text="Pythagoras Aufgabe 3")
+        Tutoring.objects.create(
+            date="2022-01-15",
+            duration=45,
+            subject=math,
+            student=self.kat,
+            teacher=self.other,
+            content="Pythagoras bei other.te",
+        )
+
+    def search(self, **params):
+        self.client.force_authenticate(user=self.nico)
+        return self.client.get(self.url, params)
+
+    def test_search(self):
+        resp = self.search(q="pythagoras")
+        ids = [tut["id"] for tut in resp.data["results"]]
+
+        # TEST content and PDF text, only own, more matches ranked first
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(ids, [self.tut_content.id, self.tut_pdf.id])
+        self.assertFalse(resp.data["has_next"])
+
+        # TEST all words must occur
+        resp = self.search(q="Pythagoras Dreieck")
+        self.assertEqual([tut["id"] for tut in resp.data["results"]], [self.tut_content.id])
+
+        # TEST FTS syntax is not interpreted
+        resp = self.search(q='"Pythagoras OR')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["results"], [])
+
+    def test_pagination(self):
+        resp_first = self.search(q="pythagoras", page_size=1)
+        resp_second = self.search(q="pythagoras", page_size=1, page=2)
+
+        self.assertEqual(len(resp_first.data["results"]), 1)
+        self.assertTrue(resp_first.data["has_next"])
+        self.assertEqual(resp_second.data["results"][0]["id"], self.tut_pdf.id)
+        self.assertFalse(resp_second.data["has_next"])
+
+    def test_invalid(self):
+        self.assertEqual(self.search().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.search(q="x", page=0).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search(q="pythagoras")
+
+        # TEST the index is kept in sync and searched once per query
+        self.assertEqual(missing_fts_triggers(), [])
+        if connection.vendor == "sqlite":
+            self.assertEqual(sum(q["sql"].count("MATCH") for q in queries.captured_queries), 1)
+
+    def test_triggers_recreated(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("FTS5 triggers only on SQLite")
+        # as after a migration rebuilding checkweb_tutoring
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {FTS_TABLE}_update")
+        self.tut_content.content = "Satz des Thales"
+        self.tut_content.save()
+
+        create_fts_triggers(sender=None)
+
+        # TEST triggers back, changes made without them indexed
+        self.assertEqual(missing_fts_triggers(), [])
+        resp = self.search(q="thales")
+        self.assertEqual([tut["id"] for tut in resp.data["results"]], [self.tut_content.id])
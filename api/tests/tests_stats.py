@@ -0,0 +1,95 @@
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+import os
+
+from checkmathe.instrumentation import reset_stats, stats_key
+from checkweb.models import User
+
+INSTRUMENTED = ["checkmathe.instrumentation.InstrumentationMiddleware", *settings.MIDDLEWARE]
+
+
+@override_settings(INSTRUMENTATION=True, MIDDLEWARE=INSTRUMENTED)
+class StatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_stats()
+        self.client = APIClient()
+        self.url = reverse("api:stats")
+
+        self.admin = User.objects.create_user(
+            "admin", "admin@mail.de", "password", first_name="Ad", last_name="Min"
+        )
+        self.admin.is_staff = True
+        self.admin.save()
+        self.kat = User.objects.create_user(
+            "kat.ev", "kat.ev@web.de", "password", first_name="Katniss", last_name="Everdeen"
+        )
+
+    def test_stats(self):
+        self.client.force_authenticate(user=self.kat)
+        resp_subjects = self.client.get(reverse("api:subject"))
+        self.client.get(reverse("api:subject"))
+        resp_as_student = self.client.get(self.url)
+
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(self.url)
+
+        # TEST Server-Timing header
+        self.assertRegex(
+            resp_subjects["Server-Timing"],
+            r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", db-conn;desc="reused"$',
+        )
+
+        # TEST staff only
+        self.assertEqual(resp_as_student.status_code, status.HTTP_403_FORBIDDEN)
+
+        # TEST aggregated per endpoint
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        stats = resp.data["endpoints"]["GET api:subject"]
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(sum(stats["histogram"].values()), 2)
+        self.assertEqual(stats["bytes_mean"], len(resp_subjects.content))
+        self.assertIn("GET api:stats", resp.data["endpoints"])
+        self.assertEqual(stats["connections_reused"], 1)  # then cached, without DB
+        self.assertGreaterEqual(resp.data["connections"]["reused"], 1)
+        self.assertIn("conn_max_age", resp.data["connections"])
+        self.assertEqual(resp.data["pids"], [os.getpid()])
+
+    def test_stats_of_all_processes(self):
+        self.client.get(reverse("api:subject"))
+
+        # another worker's stats, as published to the shared cache
+        generation = cache.get("stats:generation")
+        other = {"samples": {"GET api:subject": [(5.0, 1, 1.0, 10, "opened")]}}
+        other["connections"] = {"opened": 1, "reused": 0}
+        cache.set(stats_key(generation, 1), other)
+        cache.set(stats_key(generation), [1, *cache.get(stats_key(generation))])
+
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(self.url)
+
+        # TEST merged over the processes
+        self.assertEqual(resp.data["pids"], sorted([1, os.getpid()]))
+        self.assertEqual(resp.data["endpoints"]["GET api:subject"]["count"], 2)
+        self.assertGreaterEqual(resp.data["connections"]["opened"], 1)
+
+        # TEST reset for all processes
+        self.client.delete(self.url)
+        resp_reset = self.client.get(self.url)
+        self.assertEqual(resp_reset.data["pids"], [os.getpid()])
+        self.assertNotIn("GET api:subject", resp_reset.data["endpoints"])
+
+    @override_settings(INSTRUMENTATION_SLOW_MS=0)
+    def test_slow_request_log(self):
+        with self.assertLogs("checkmathe.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("api:subject"))
+
+        # TEST names the endpoint and its queries
+        self.assertIn("Slow request GET api:subject", logs.output[0])
+        self.assertIn("checkweb_subject", logs.output[0])
@@ -5,6 +5,8 @@ from django.contrib.auth.models import Group
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -125,4 +127,74 @@ class TutoringTestCase(TestCase):
 
         # TEST as own teacher: put (changed content)
         self.assertEqual(resp_as_own_teacher.status_code, 200)
-        self.assertEqual(Tutoring.objects.get(id=tut_nr).content, "New Content. Ananas.")
\ No newline at end of file
+        self.assertEqual(Tutoring.objects.get(id=tut_nr).content, "New Content. Ananas.")
+
+    def test_get_tutoring_loaded_once(self):
+        tut_url = reverse("api:tutoring", kwargs={"tut_id": self.tut.id})
+        self.client.force_authenticate(user=self.nico)
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(tut_url)
+
+        # TEST permissions and view share one Tutoring query (with participants joined)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json().get("teacher_username"), "nico.st")
+        tut_queries = [q for q in queries.captured_queries if "checkweb_tutoring" in q["sql"]]
+        self.assertEqual(len(tut_queries), 1)
+        self.assertLessEqual(len(queries), 2)  # role of requesting user, Tutoring
+
+    def test_get_tutoring_not_existing(self):
+        self.client.force_authenticate(user=self.nico)
+        resp = self.client.get(reverse("api:tutoring", kwargs={"tut_id": self.tut.id + 1}))
+
+        # TEST not existing: no permission to participate
+        self.assertEqual(resp.status_code, 403)
+
+    def test_list_tutorings(self):
+        for day in range(1, 6):
+            Tutoring.objects.create(
+                date=f"2022-01-0{day}",
+                duration=45,
+                subject=Subject.objects.get(title="Math"),
+                student=self.kat,
+                teacher=self.xavier,
+                content=f"Day {day}",
+                paid=day % 2 == 0,
+            )
+        url = reverse("api:tutoring")
+
+        # TEST only own Tutorings: nico teaches just one
+        self.client.force_authenticate(user=self.nico)
+        resp_nico = self.client.get(url)
+        self.assertEqual(resp_nico.status_code, 200)
+        self.assertEqual([tut["id"] for tut in resp_nico.json()["results"]], [self.tut.id])
+        self.assertIsNone(resp_nico.json()["next"])
+
+        # TEST pages follow (date, id) newest first without gaps
+        self.client.force_authenticate(user=self.kat)
+        seen = []
+        cursor = None
+        while True:
+            params = {"page_size": 2, "teacher": "xavier.x"}
+            if cursor:
+                params["cursor"] = cursor
+            resp = self.client.get(url, params)
+            self.assertLessEqual(len(resp.json()["results"]), 2)
+            seen += [tut["content"] for tut in resp.json()["results"]]
+            cursor = resp.json()["next"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["Day 5", "Day 4", "Day 3", "Day 2", "Day 1"])
+
+        # TEST filters
+        resp_paid = self.client.get(url, {"paid": "true", "date_from": "2022-01-03"})
+        self.assertEqual([tut["content"] for tut in resp_paid.json()["results"]], ["Day 4"])
+
+        # TEST invalid cursor
+        resp_invalid = self.client.get(url, {"cursor": "INVALID"})
+        self.assertEqual(resp_invalid.status_code, 400)
+
+        # TEST page_size below 1 (empty pages with a next cursor forever)
+        for page_size in [0, -1]:
+            resp_invalid = self.client.get(url, {"page_size": page_size})
+            self.assertEqual(resp_invalid.status_code, 400)
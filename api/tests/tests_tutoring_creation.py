@@ -4,14 +4,16 @@ from rest_framework.test import APIClient
 from django.contrib.auth.models import Group
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 import os
 import json
 
-from checkweb.models import Subject, Tutoring, User
+from checkweb.models import MonthlyBalance, Subject, Tutoring, User
 from ..serializers import SubjectSerializer
 
 
@@ -398,5 +400,78 @@ class CreateTutoringViewTests(TestCase):
         self.assertEqual(resp_with_pdf.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Tutoring.objects.all().count(), 1)
 
-        # Prevent PDFs staying stored in filesystem
-        Tutoring.objects.get(id=Tutoring.objects.get(date="2023-01-01").id).delete()
+        # TEST PDF answered as the endpoint of its presigned download URL
+        tut = Tutoring.objects.get(date="2023-01-01")
+        pdf_url = reverse("api:tutoring_pdf", args=[tut.id])
+        self.assertEqual(resp_with_pdf.data["pdf"], pdf_url)
+        self.assertEqual(tut.serialize()["pdf"], pdf_url)
+
+        # Prevent PDFs staying stored in filesystem (deleted from storage on commit)
+        with self.captureOnCommitCallbacks(execute=True):
+            Tutoring.objects.get(id=Tutoring.objects.get(date="2023-01-01").id).delete()
+
+    def test_creation_bulk(self):
+        def tut(day, **changes):
+            return {
+                "subject_title": "Math",
+                "teacher_username": "nico.st",
+                "student_username": "kat.ev",
+                "yyyy_mm_dd": day,
+                "duration_in_min": 45,
+                "content": "Sinussatz",
+                **changes,
+            }
+
+        resp_invalid = self.client.post(
+            self.url,
+            [
+                tut("2022-01-01"),
+                tut("2022-01-02", student_username="INVALID_USER"),
+                tut("2999-01-01", duration_in_min=0),
+            ],
+            format="json",
+        )
+
+        # TEST invalid items: errors per item, none created
+        self.assertEqual(resp_invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e["index"] for e in resp_invalid.data["errors"]], [1, 2])
+        self.assertIn("student_username", resp_invalid.data["errors"][0]["errors"])
+        self.assertEqual(
+            set(resp_invalid.data["errors"][1]["errors"]), {"yyyy_mm_dd", "duration_in_min"}
+        )
+        self.assertEqual(Tutoring.objects.all().count(), 0)
+
+        # TEST user in both groups: rejected by its role as Tutoring.clean does, not a 500
+        both = User.objects.create_user(
+            "both.x", "both.x@mail.de", "password", first_name="Both", last_name="X"
+        )
+        both.groups.set([self.teach, Group.objects.get(name="Student")])
+        resp_both = self.client.post(
+            self.url,
+            [
+                tut("2022-04-01", teacher_username="both.x"),
+                tut("2022-04-02", student_username="both.x"),
+            ],
+            format="json",
+        )
+        self.assertEqual(resp_both.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(resp_both.data["errors"]), 1)
+        self.assertEqual(Tutoring.objects.all().count(), 0)
+
+        tuts = [tut(f"2022-0{month}-{day:02}") for month in (1, 2) for day in range(1, 26)]
+        tuts.append(tut("2022-03-01", subject_title="Astronomy"))
+        with CaptureQueriesContext(connection) as queries:
+            resp_valid = self.client.post(self.url, tuts, format="json")
+
+        # TEST valid: all created in a fixed number of queries, new Subject created
+        self.assertEqual(resp_valid.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(resp_valid.data["created"]), 51)
+        self.assertEqual(Tutoring.objects.all().count(), 51)
+        self.assertTrue(Subject.objects.filter(title="Astronomy").exists())
+        self.assertLess(len(queries), 20)
+
+        # TEST balances kept up to date
+        self.assertEqual(
+            sorted(MonthlyBalance.objects.filter(student=self.kat).values_list("count", flat=True)),
+            [1, 25, 25],
+        )
@@ -1,10 +1,11 @@
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from django.contrib.auth.models import Group
+from django.contrib.auth.models import Group, update_last_login
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -18,6 +19,7 @@ from ..serializers import SubjectSerializer
 
 class UserViewTests(TestCase):
     def setUp(self):
+        cache.clear()  # cached responses outlive the rolled back DB
         self.client = APIClient()
         self.teacher_user = User.objects.create_user(
             username="teacher_user",
@@ -45,6 +47,75 @@ class UserViewTests(TestCase):
         response = self.client.get(reverse("api:user", kwargs={"username": "INVALID"}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_all_users_query_count(self):
+        for i in range(5):
+            User.objects.create_user(
+                username=f"student_{i}",
+                password="password",
+                email=f"student_{i}@example.com",
+                first_name="student",
+                last_name=f"{i}",
+            )
+
+        self.client.force_authenticate(user=self.teacher_user)
+        with self.assertNumQueries(3):  # role of requesting user, users, prefetched groups
+            response = self.client.get(reverse("api:user"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), User.objects.count())
+        self.assertEqual(
+            {user["username"]: user["group"] for user in response.json()}["teacher_user"],
+            "Teacher",
+        )
+
+    def test_get_all_users_cached(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(reverse("api:user"))
+        with self.assertNumQueries(0):
+            response_cached = self.client.get(reverse("api:user"))
+            response_not_modified = self.client.get(
+                reverse("api:user"), HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        # TEST repeated: from cache resp. 304 via ETag, without DB
+        self.assertEqual(response_cached.json(), response.json())
+        self.assertEqual(response_cached["ETag"], response["ETag"])
+        self.assertEqual(response_not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # TEST login (saving last_login only): still current
+        update_last_login(None, self.student_user)
+        response_after_login = self.client.get(
+            reverse("api:user"), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response_after_login.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # TEST changed users and groups: invalidated
+        User.objects.create_user(
+            "new_user", "new@example.com", "password", first_name="new", last_name="user"
+        )
+        response_new_user = self.client.get(reverse("api:user"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response_new_user.status_code, status.HTTP_200_OK)
+        self.assertIn("new_user", [user["username"] for user in response_new_user.json()])
+
+        self.student_user.groups.set([Group.objects.get(name="Teacher")])
+        response_new_group = self.client.get(reverse("api:user"))
+        self.assertNotEqual(response_new_group["ETag"], response_new_user["ETag"])
+        self.assertEqual(
+            {user["username"]: user["group"] for user in response_new_group.json()}["student_user"],
+            "Teacher",
+        )
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    )
+    def test_get_all_users_without_cache(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(reverse("api:user"), HTTP_IF_NONE_MATCH='"users-None"')
+
+        # TEST no versions kept: no ETag, never 304
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+
     def test_post_user_teacher(self):
         self.client.force_authenticate(user=self.teacher_user)
         data = {
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import views_basic, views_tutoring, views_permissions, views_user, views_book
+from .views import views_basic, views_tutoring, views_permissions, views_user, views_book, views_calendar, views_search, views_export, views_stats, views_async, views_pdf
 from rest_framework.authtoken.views import obtain_auth_token
 
 app_name = "api"
@@ -9,9 +9,25 @@ urlpatterns = [
     path("subject/", views_basic.SubjectView.as_view(), name="subject"),
     path("tutoring/", views_tutoring.TutoringView.as_view(), name="tutoring"),
     path("tutoring/<int:tut_id>/", views_tutoring.TutoringView.as_view(), name="tutoring"),
+    path("tutoring/<int:tut_id>/pdf/", views_pdf.PdfDownloadView.as_view(), name="tutoring_pdf"),
+    path("tutoring/<int:tut_id>/pdf/upload/", views_pdf.PdfUploadView.as_view(), name="tutoring_pdf_upload"),
+    path("tutoring/<int:tut_id>/pdf/confirm/", views_pdf.PdfConfirmView.as_view(), name="tutoring_pdf_confirm"),
     path("user/", views_user.UserView.as_view(), name="user"),
     path("user/<str:username>/", views_user.UserView.as_view(), name="user"),
     path("tuts_per_month/<str:student_username>/", views_tutoring.TutsPerMonthView.as_view(), name="tuts_per_month"),
     path("tuts_per_month/<str:student_username>/<str:year>/<str:month>/", views_tutoring.TutsPerMonthView.as_view(), name="tuts_per_month"),
+    path("settle/", views_tutoring.SettleView.as_view(), name="settle"),
+    path("search/", views_search.SearchView.as_view(), name="search"),
+    path("export.csv", views_export.ExportView.as_view(), name="export"),
+    path("stats/", views_stats.StatsView.as_view(), name="stats"),
+    path("calendar.ics", views_calendar.CalendarView.as_view(), name="calendar"),
+    path("calendar/token/", views_calendar.CalendarTokenView.as_view(), name="calendar_token"),
+    # async variants for ASGI servers, see views_async
+    path("async/tutoring/", views_async.tutoring_view, name="async_tutoring"),
+    path("async/tutoring/<int:tut_id>/", views_async.tutoring_view, name="async_tutoring"),
+    path("async/tuts_per_month/<str:student_username>/", views_async.tuts_per_month_view, name="async_tuts_per_month"),
+    path("async/tuts_per_month/<str:student_username>/<str:year>/<str:month>/", views_async.tuts_per_month_view, name="async_tuts_per_month"),
+    path("async/user/", views_async.user_view, name="async_user"),
+    path("async/user/<str:username>/", views_async.user_view, name="async_user"),
     # path("book", views_book.BookView.as_view(), name="book"),
 ]
\ No newline at end of file
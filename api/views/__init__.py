@@ -2,4 +2,10 @@ from .views_basic import *
 from .views_tutoring import *
 from .views_permissions import *
 from .views_user import *
-from .views_book import *
\ No newline at end of file
+from .views_book import *
+from .views_calendar import *
+from .views_search import *
+from .views_export import *
+from .views_stats import *
+from .views_async import *
+from .views_pdf import *
\ No newline at end of file
@@ -0,0 +1,355 @@
+"""Async variants of the tutoring, per-month and user endpoints (under api/async/), for ASGI
+servers (see gunicorn.conf.py): waiting on the DB or the storage does not hold a worker thread.
+
+Same methods, params, guards and answers as their DRF counterparts (DRF views can not be async),
+except creating users (POST api/user/), only served by UserView.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import serializers, status
+
+from datetime import datetime
+from functools import wraps
+import json
+
+from checkweb.ledger import month_ledger, monthly_ledger, student_tutorings
+from checkweb.models import Subject, Tutoring, User
+
+from ..authentication import aauthenticate
+from ..caching import aversioned_response
+from ..pagination import keyset_query, keyset_split
+from ..serializers import TutoringApiSerializer, save_bulk_tutorings, validate_bulk_tutorings
+from .views_tutoring import filter_own_tutorings, is_valid_month, monthly_summary, summary_rows
+
+
+NOT_AUTHENTICATED = {"detail": "Authentication credentials were not provided."}
+PERMISSION_DENIED = {"detail": "You do not have permission to perform this action."}
+
+
+def async_token_required(teacher=False):
+    """Authenticates the async view via token (as CachedTokenAuthentication) into request.user;
+    if teacher, only for Users in Group Teacher"""
+
+    def decorator(view_func):
+        @csrf_exempt  # token, not cookie authenticated
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            user = await aauthenticate(request)
+            if user is None:
+                return JsonResponse(NOT_AUTHENTICATED, status=status.HTTP_401_UNAUTHORIZED)
+            if teacher and not user.is_teacher:
+                return JsonResponse(PERMISSION_DENIED, status=status.HTTP_403_FORBIDDEN)
+
+            request.user = user
+            return await view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
+
+
+@async_token_required()
+async def tutoring_view(request, tut_id=None):
+    """GET: returns tut if participating as teacher (without tut_id: own tuts, as TutoringView.list)
+    POST: creates tut (JSON or multipart with pdf), or all tuts of a JSON list, if teacher
+    PUT: updates tut by {"new_values": {...}} if participating as teacher
+    DELETE: deletes tut if participating as teacher"""
+
+    if tut_id is None:
+        if request.method == "GET":
+            return await list_tutorings(request)
+        if request.method != "POST":
+            return JsonResponse({"error": "Method not allowed."}, status=405)
+        if not request.user.is_teacher:
+            return JsonResponse(PERMISSION_DENIED, status=status.HTTP_403_FORBIDDEN)
+        return await create_tutoring(request)
+
+    if request.method not in ("GET", "PUT", "DELETE"):
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+
+    tut = await Tutoring.objects.serializable().filter(id=tut_id).afirst()
+
+    # Guard: as TutoringView, only teachers participating
+    if (
+        tut is None
+        or not request.user.is_teacher
+        or request.user.id not in (tut.student_id, tut.teacher_id)
+    ):
+        return JsonResponse(PERMISSION_DENIED, status=status.HTTP_403_FORBIDDEN)
+
+    if request.method == "PUT":
+        return await update_tutoring(request, tut)
+    if request.method == "DELETE":
+        await tut.adelete()
+        return JsonResponse({"message": f"Tutoring session with id {tut_id} has been deleted."})
+    return JsonResponse(tut.serialize())
+
+
+async def list_tutorings(request):
+    params = request.GET
+    try:
+        tuts, page_size = filter_own_tutorings(request.user, params)
+        tuts = keyset_query(tuts, params.get("cursor"))
+        page, next_cursor = keyset_split([tut async for tut in tuts[: page_size + 1]], page_size)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return JsonResponse({"results": [tut.serialize() for tut in page], "next": next_cursor})
+
+
+def parse_json(request):
+    """Body of a JSON request, None if invalid"""
+    try:
+        return json.loads(request.body)
+    except ValueError:
+        return None
+
+
+async def create_tutoring(request):
+    if request.content_type == "application/json":
+        data, pdf = parse_json(request), None
+        if data is None:
+            return JsonResponse({"error": "Invalid JSON."}, status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(data, list):
+            return await create_tutorings(data)
+    else:
+        data, pdf = request.POST, request.FILES.get("pdf")
+
+    # Guard: fields must be valid, as TutoringApiSerializer
+    validator = TutoringApiSerializer()
+    try:
+        for field in ["subject_title", "yyyy_mm_dd", "duration_in_min"]:
+            if not data.get(field):
+                raise serializers.ValidationError({field: "This field is required."})
+        validator.validate_date(data["yyyy_mm_dd"])
+        validator.validate_duration(int(data["duration_in_min"]))
+        if pdf is not None:
+            validator.validate_pdf(pdf)
+        users = {
+            user.username: user
+            async for user in User.objects.filter(
+                username__in=[data.get("teacher_username"), data.get("student_username")]
+            ).prefetch_related("groups")
+        }
+        if data.get("teacher_username") not in users or data.get("student_username") not in users:
+            raise serializers.ValidationError({"teacher": "Teacher or Student does not exist."})
+    except (TypeError, ValueError):
+        return JsonResponse(
+            {"error": "duration_in_min must be an integer."}, status=status.HTTP_400_BAD_REQUEST
+        )
+    except serializers.ValidationError as e:
+        return JsonResponse({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+    subject, created = await Subject.objects.aget_or_create(title=data["subject_title"])
+    tut = Tutoring(
+        date=datetime.strptime(data["yyyy_mm_dd"], "%Y-%m-%d").date(),
+        duration=int(data["duration_in_min"]),
+        subject=subject,
+        teacher=users[data["teacher_username"]],
+        student=users[data["student_username"]],
+        content=data.get("content", ""),
+    )
+
+    # upload in a thread of its own: the event loop serves other requests meanwhile
+    if pdf is not None:
+        field = Tutoring._meta.get_field("pdf")
+        save = sync_to_async(field.storage.save, thread_sensitive=False)
+        tut.pdf = await save(field.generate_filename(tut, pdf.name), pdf, field.max_length)
+
+    try:
+        await tut.asave()
+    except ValidationError as e:
+        if pdf is not None:
+            await sync_to_async(tut.pdf.storage.delete, thread_sensitive=False)(tut.pdf.name)
+        return JsonResponse({"error": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+    return JsonResponse(tut.serialize(), status=status.HTTP_201_CREATED)
+
+
+async def create_tutorings(items):
+    """As TutoringView.post_many: all Tutorings in one transaction, or none if any is invalid"""
+
+    # Guard: between 1 and 1000 Tutorings
+    if not 0 < len(items) <= 1000:
+        return JsonResponse(
+            {"error": "Provide between 1 and 1000 Tutorings."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    tutorings, errors = await sync_to_async(validate_bulk_tutorings)(items)
+
+    # Guard: all Tutorings must be valid
+    if errors:
+        return JsonResponse(
+            {
+                "error": "Invalid Tutorings, none created.",
+                "errors": [{"index": index, "errors": errors[index]} for index in sorted(errors)],
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    tutorings = await sync_to_async(transaction.atomic(save_bulk_tutorings))(tutorings)
+    return JsonResponse(
+        {"created": [tut.serialize() for tut in tutorings]}, status=status.HTTP_201_CREATED
+    )
+
+
+async def update_tutoring(request, tut):
+    """As TutoringView.put: sets the fields of the JSON's new_values"""
+    data = parse_json(request)
+
+    # Guard: new_values must be an object
+    if not isinstance(data, dict) or not isinstance(data.get("new_values"), dict):
+        return JsonResponse(
+            {"error": "Provide new_values as object."}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    new_values = data["new_values"]
+    for key, value in new_values.items():
+        setattr(tut, key, value)
+    try:
+        await tut.asave()
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+    value_dict_as_string = " ".join([f"{key}: {value}" for key, value in new_values.items()])
+    return JsonResponse(
+        {
+            "message": f"Tutoring session with id {tut.id} has been modified: {value_dict_as_string}.",
+            "new": tut.serialize(),
+        }
+    )
+
+
+@async_token_required()
+async def tuts_per_month_view(request, student_username, year=None, month=None):
+    """GET: as TutsPerMonthView
+    POST (without year, month): sets paid of own tuts of student in the JSON's year, month,
+    as TutsPerMonthView"""
+
+    if request.method == "POST" and not (year or month):
+        return await settle_month(request, student_username)
+    if request.method != "GET":
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+
+    # Guard: block if student tries to view other tuts
+    if not request.user.is_teacher and request.user.username != student_username:
+        return JsonResponse(
+            {"error": "You as student may not spectate other Tutorings."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    stud = await User.objects.filter(username=student_username).afirst()
+
+    # Guard: student must exist
+    if stud is None:
+        return JsonResponse(
+            {"error": f"User {student_username} does not exist."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    # Guard: preis_pro_45 not set
+    if not stud.preis_pro_45:
+        return JsonResponse(
+            {"error": "Set your price per 45 minutes in your profile."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    # Guard: broken request
+    if (not year and month) or (year and not month):
+        return JsonResponse(
+            {"error": "Provide year and month both or none of them."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Guard: year, month must be valid
+    if year and month and not is_valid_month(year, month):
+        return JsonResponse(
+            {"error": f"Invalid month: {year}-{month}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if request.GET.get("summary") == "true":
+        rows = [row async for row in summary_rows(stud, year, month)]
+        return JsonResponse(monthly_summary(rows))
+
+    tuts = student_tutorings(stud)
+    if year and month:
+        tuts = [tut async for tut in tuts.in_month(year, month)]
+        return JsonResponse(month_ledger(tuts))
+    return JsonResponse(monthly_ledger([tut async for tut in tuts]))
+
+
+async def settle_month(request, student_username):
+    data = parse_json(request)
+
+    # Guard: paid must be boolean
+    if not isinstance(data, dict) or not isinstance(data.get("paid"), bool):
+        return JsonResponse({"error": "paid must be boolean"}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Guard: year, month must be provided
+    if not data.get("year") or not data.get("month"):
+        return JsonResponse(
+            {"error": "year, month must be provided"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Guard: year, month must be valid
+    if not is_valid_month(data.get("year"), data.get("month")):
+        return JsonResponse(
+            {"error": f"Invalid month: {data.get('year')}-{data.get('month')}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Guard: student_username must be valid
+    if not await User.objects.filter(username=student_username).aexists():
+        return JsonResponse(
+            {"error": "student_username must be valid"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    tuts = Tutoring.objects.filter(
+        teacher=request.user,
+        student__username=student_username,
+    ).in_month(data.get("year"), data.get("month"))
+
+    return JsonResponse(
+        {
+            "message": "Success changing paid status of Tutorings.",
+            "new": await sync_to_async(tuts.settle)(data.get("paid")),
+        }
+    )
+
+
+@async_token_required(teacher=True)
+async def user_view(request, username=None):
+    """GET: all users (cached until a User or their groups change), or the one of username,
+    as UserView
+    DELETE: deletes the user of username, as UserView"""
+
+    if username is None:
+        if request.method != "GET":
+            return JsonResponse({"error": "Method not allowed."}, status=405)
+
+        async def build():
+            return [user.serialize() async for user in User.objects.prefetch_related("groups")]
+
+        return await aversioned_response(request, "users", [User], build)
+
+    if request.method not in ("GET", "DELETE"):
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+
+    user = await User.objects.prefetch_related("groups").filter(username=username).afirst()
+
+    # Guard: user must exist
+    if user is None:
+        return JsonResponse(
+            {"error": f"User {username} does not exist."}, status=status.HTTP_404_NOT_FOUND
+        )
+
+    if request.method == "DELETE":
+        await user.adelete()
+        return JsonResponse({"message": f"User {username} has been deleted."})
+    return JsonResponse(user.serialize())
@@ -11,16 +11,20 @@ from django.shortcuts import get_object_or_404
 from datetime import datetime, date
 import re
 
+from ..caching import versioned_response
 from ..serializers import SubjectSerializer, TutoringSerializer, TutoringApiSerializer
 
 
 class SubjectView(APIView):
     def get(self, request):
-        """Returns all serialized Subject objects"""
-        
-        subjects = Subject.objects.all()
-        serializer = SubjectSerializer(subjects, many=True)  # True: seri multiple items
-        return Response(serializer.data)
+        """Returns all serialized Subject objects (cached until a Subject changes)"""
+
+        def build():
+            subjects = Subject.objects.all()
+            serializer = SubjectSerializer(subjects, many=True)  # True: seri multiple items
+            return list(serializer.data)
+
+        return versioned_response(request, "subjects", [Subject], build)
     
     def post(self, request):
         """Creates a new Subject object;
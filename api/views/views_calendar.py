@@ -0,0 +1,96 @@
+from rest_framework import authentication, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from checkweb.caching import model_versions
+from checkweb.models import FeedToken, Subject, Tutoring, User
+
+from django.db.models import Count, Max, Q
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from datetime import timedelta
+from icalendar import Event
+
+from ..authentication import CachedTokenAuthentication, FeedTokenAuthentication
+
+
+CALENDAR_HEADER = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//CheckMathe//Tutorings//EN\r\n"
+CALENDAR_FOOTER = b"END:VCALENDAR\r\n"
+
+
+def tutoring_event(tut):
+    """VEVENT of a Tutoring; all-day since Tutorings only have a date, no time"""
+    event = Event()
+    event.add("uid", f"tutoring-{tut.id}@checkmathe")
+    event.add("dtstamp", tut.modified)
+    event.add("last-modified", tut.modified)
+    event.add("dtstart", tut.date)
+    event.add("dtend", tut.date + timedelta(days=1))
+    event.add("summary", f"{tut.subject}: {tut.student.username} with {tut.teacher.username}")
+    event.add("description", f"{tut.duration} min\n\n{tut.content}")
+    return event.to_ical()
+
+
+class CalendarView(APIView):
+    """GET: iCalendar feed (.ics) of own Tutorings as teacher or student
+
+    Authenticate via header or ?token=<feed token> (for calendar apps, see CalendarTokenView).
+    Answers 304 if unchanged since the ETag / Last-Modified of the last poll.
+    """
+
+    authentication_classes = [CachedTokenAuthentication, FeedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        tuts = Tutoring.objects.filter(Q(teacher=request.user) | Q(student=request.user))
+
+        # cheap version of the feed: changes bump modified, deletions the count, renamed
+        # subjects and users (in the events' summary) their versions; unknown without a cache
+        latest = tuts.aggregate(count=Count("id"), modified=Max("modified"))
+        modified = latest["modified"].timestamp() if latest["modified"] else 0
+        last_modified = int(modified) if modified else None
+        versions = model_versions(Subject, User)
+        etag = None
+        if None not in versions:
+            parts = [request.user.id, latest["count"], modified, *versions]
+            etag = '"%s"' % "-".join(str(part) for part in parts)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        def stream():
+            yield CALENDAR_HEADER
+            events = tuts.select_related("subject", "teacher", "student").order_by("date", "id")
+            for tut in events.iterator(chunk_size=500):
+                yield tutoring_event(tut)
+            yield CALENDAR_FOOTER
+
+        response = StreamingHttpResponse(stream(), content_type="text/calendar; charset=utf-8")
+        if etag is not None:
+            response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class CalendarTokenView(APIView):
+    """GET: URL of the own iCalendar feed with its feed token (created on first use)
+    POST: the URL with a new feed token, the old URL stops working"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        token = FeedToken.objects.filter(user=request.user).first()
+        return Response(self.feed(request, token or FeedToken.rotate(request.user)))
+
+    def post(self, request):
+        token = FeedToken.rotate(request.user)
+        return Response(self.feed(request, token), status=status.HTTP_201_CREATED)
+
+    def feed(self, request, token):
+        url = request.build_absolute_uri(reverse("api:calendar"))
+        return {"url": f"{url}?token={token.key}"}
@@ -0,0 +1,78 @@
+from rest_framework.response import Response
+from rest_framework import authentication, status
+from rest_framework.views import APIView
+
+from checkweb.models import Tutoring, price_expression
+
+from django.http import StreamingHttpResponse
+from datetime import date, datetime
+import csv
+
+from ..authentication import CachedTokenAuthentication
+from .views_permissions import IsTeacher
+
+
+EXPORT_COLUMNS = ["date", "student", "subject", "duration", "content", "price", "paid"]
+
+
+class Echo:
+    """File-like object handing written lines back instead of buffering them"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(tuts, chunk_size=2000):
+    """CSV lines of the Tutorings, read via a server-side cursor chunk by chunk"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+
+    rows = (
+        tuts.annotate(price=price_expression())
+        .order_by("date", "id")
+        .values_list(
+            "date", "student__username", "subject__title", "duration", "content", "price", "paid"
+        )
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield writer.writerow(row)
+
+
+class ExportView(APIView):
+    """GET: streams own tutored Tutorings as CSV, e.g. for accounting"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsTeacher]
+
+    def get(self, request):
+        """returns CSV with one line per Tutoring, ordered by date
+
+        Args:
+            OPT year (int): only Tutorings of that year
+            OPT date_from, date_to (str): yyyy-mm-dd, inclusive
+            OPT student (str): username
+        """
+
+        params = request.query_params
+        tuts = Tutoring.objects.filter(teacher=request.user)
+        year = None
+
+        # Guard: year, dates must be valid
+        try:
+            if params.get("year"):
+                year = int(params["year"])
+                tuts = tuts.filter(date__gte=date(year, 1, 1), date__lt=date(year + 1, 1, 1))
+            if params.get("date_from"):
+                tuts = tuts.filter(date__gte=datetime.strptime(params["date_from"], "%Y-%m-%d"))
+            if params.get("date_to"):
+                tuts = tuts.filter(date__lte=datetime.strptime(params["date_to"], "%Y-%m-%d"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if params.get("student"):
+            tuts = tuts.filter(student__username=params["student"])
+
+        filename = f"tutorings_{year or 'all'}.csv"
+        response = StreamingHttpResponse(export_rows(tuts), content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
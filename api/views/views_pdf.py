@@ -0,0 +1,112 @@
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.views import APIView
+
+from checkweb.models import Tutoring
+from checkweb.presigned import (
+    download_url,
+    has_pdf_header,
+    new_upload_name,
+    sign,
+    unsign,
+    upload_url,
+)
+
+from django.conf import settings
+from django.core import signing
+
+from ..authentication import CachedTokenAuthentication
+from .views_permissions import IsParticipating, IsTeacher, IsTeaching, load_tutoring
+
+
+class PdfDownloadView(APIView):
+    """GET: short-lived URL to download the Tutoring's PDF directly from the storage,
+    if participating as teacher (as TutoringView GET)"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsTeacher, IsParticipating]
+
+    def get(self, request, tut_id):
+        tut = load_tutoring(self)
+
+        # Guard: tut must have a PDF
+        if not tut.pdf:
+            return Response(
+                {"error": f"Tutoring with id {tut_id} has no PDF."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(
+            {
+                "url": download_url(tut.pdf.storage, tut.pdf.name, request),
+                "expires_in": settings.PDF_URL_EXPIRY,
+            }
+        )
+
+
+class PdfUploadView(APIView):
+    """POST: short-lived URL to POST a new PDF of the Tutoring directly to the storage,
+    if teacher of it; attach it afterwards via PdfConfirmView with the returned "upload"
+    """
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsTeaching]
+
+    def post(self, request, tut_id):
+        tut = load_tutoring(self)
+        field = Tutoring._meta.get_field("pdf")
+        name = new_upload_name(field, tut)
+
+        return Response(
+            {
+                **upload_url(field.storage, name, request),
+                "upload": sign({"tut_id": tut.id, "name": name}),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class PdfConfirmView(APIView):
+    """POST: attaches the PDF uploaded via PdfUploadView's URL to the Tutoring (replacing the old
+    one), if teacher of it; processed in the background as any new PDF
+
+    Args:
+        upload (str): "upload" as returned by PdfUploadView
+    """
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsTeaching]
+
+    def post(self, request, tut_id):
+        tut = load_tutoring(self)
+
+        # Guard: upload must be issued for this tut, time to upload and to confirm
+        try:
+            upload = unsign(request.data.get("upload", ""), max_age=2 * settings.PDF_URL_EXPIRY)
+        except signing.BadSignature:
+            return Response(
+                {"error": "Invalid or expired upload."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if upload["tut_id"] != tut.id:
+            return Response(
+                {"error": "Upload belongs to another Tutoring."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Guard: the file must have been uploaded
+        if not tut.pdf.storage.exists(upload["name"]):
+            return Response(
+                {"error": "Upload the PDF to the URL first."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Guard: the file must be a PDF, else it is deleted
+        if not has_pdf_header(tut.pdf.storage, upload["name"]):
+            tut.pdf.storage.delete(upload["name"])
+            return Response(
+                {"error": "Uploaded file is no PDF."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # the signals delete the replaced PDF and process the new one
+        tut.pdf.name = upload["name"]
+        tut.save(update_fields=["pdf", "pdf_status", "pdf_pages", "pdf_text", "modified"])
+        return Response(tut.serialize())
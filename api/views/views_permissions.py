@@ -14,30 +14,36 @@ import re
 from ..serializers import SubjectSerializer, TutoringSerializer, TutoringApiSerializer
 
 
+def load_tutoring(view):
+    """Returns the Tutoring with the view's tut_id (None if not existing);
+    loaded once per request and cached on the view for permissions and view alike"""
+    if not hasattr(view, "_tutoring"):
+        tut_id = view.kwargs.get("tut_id")
+        view._tutoring = Tutoring.objects.serializable().filter(id=tut_id).first()
+    return view._tutoring
+
+
 class IsParticipating(permissions.BasePermission):
     """Is requesting User Student or Teacher in Tutoring with tut_id?"""
 
     def has_permission(self, request, view):
-        try:
-            tut_id = view.kwargs.get("tut_id")
-            tut = Tutoring.objects.get(id=tut_id)
-        except Tutoring.DoesNotExist:
+        tut = load_tutoring(view)
+        if tut is None:
             return False
 
-        return tut.student == request.user or tut.teacher == request.user
+        # compare IDs to not load student, teacher
+        return request.user.id in (tut.student_id, tut.teacher_id)
 
 
 class IsTeaching(permissions.BasePermission):
     """Is requesting User the teacher of the Tutoring with tut_id?"""
 
     def has_permission(self, request, view):
-        try:
-            tut_id = view.kwargs.get("tut_id")
-            tut = Tutoring.objects.get(id=tut_id)
-        except Tutoring.DoesNotExist:
+        tut = load_tutoring(view)
+        if tut is None:
             return False
 
-        return tut.teacher == request.user
+        return tut.teacher_id == request.user.id
 
 
 class IsTeacher(permissions.BasePermission):
@@ -45,7 +51,7 @@ class IsTeacher(permissions.BasePermission):
 
     def has_permission(self, request, view):
         if request.user.is_authenticated:
-            return request.user.groups.filter(name="Teacher").exists()
+            return request.user.is_teacher
         return False
 
 
@@ -54,5 +60,5 @@ class IsStudent(permissions.BasePermission):
 
     def has_permission(self, request, view):
         if request.user.is_authenticated:
-            return request.user.groups.filter(name="Student").exists()
+            return request.user.is_student
         return False
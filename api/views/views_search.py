@@ -0,0 +1,63 @@
+from rest_framework.response import Response
+from rest_framework import authentication, permissions, status
+from rest_framework.views import APIView
+
+from checkweb.models import Tutoring
+from checkweb.search import search_tutorings
+
+from django.db.models import Q
+
+from ..authentication import CachedTokenAuthentication
+
+
+class SearchView(APIView):
+    """GET: full-text search over content and PDF text of own Tutorings, best matches first"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """returns one page of matching Tutorings
+
+        Args:
+            q (str): words that must all occur
+            OPT page (int): default 1
+            OPT page_size (int): default 20, max 100
+        """
+
+        params = request.query_params
+        text = params.get("q", "").strip()
+
+        # Guard: q must be provided
+        if not text:
+            return Response(
+                {"error": "q must be provided"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Guard: page, page_size must be positive ints
+        try:
+            page = int(params.get("page", 1))
+            page_size = min(int(params.get("page_size", 20)), 100)
+            if page < 1 or page_size < 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"error": "page, page_size must be positive integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        tuts = Tutoring.objects.filter(Q(teacher=request.user) | Q(student=request.user))
+        matches = search_tutorings(tuts.serializable(), text).order_by("-rank", "-date", "-id")
+
+        # one more than needed tells whether there is a next page
+        offset = (page - 1) * page_size
+        results = list(matches[offset : offset + page_size + 1])
+
+        return Response(
+            {
+                "results": [{**tut.serialize(), "rank": tut.rank} for tut in results[:page_size]],
+                "page": page,
+                "has_next": len(results) > page_size,
+            }
+        )
@@ -0,0 +1,45 @@
+from rest_framework.response import Response
+from rest_framework import authentication, permissions, status
+from rest_framework.views import APIView
+
+from django.conf import settings
+
+from checkmathe.instrumentation import (
+    connection_stats,
+    endpoint_stats,
+    reset_stats,
+    server_snapshots,
+)
+
+from ..authentication import CachedTokenAuthentication
+
+
+class StatsView(APIView):
+    """GET: rolling time, query, size and connection stats per endpoint and DB connection totals
+    of all server processes ("pids"; each publishes to the shared cache every few seconds)
+    (staff only, see instrumentation)
+    DELETE: resets them"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        # Guard: only collected if enabled
+        if not settings.INSTRUMENTATION:
+            return Response(
+                {"error": "Instrumentation is disabled, set INSTRUMENTATION=True."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        snapshots = server_snapshots()
+        return Response(
+            {
+                "pids": sorted(snapshots),
+                "endpoints": endpoint_stats(snapshots),
+                "connections": connection_stats(snapshots),
+            }
+        )
+
+    def delete(self, request):
+        reset_stats()
+        return Response({"message": "Stats of all processes have been reset."})
@@ -5,41 +5,128 @@ from rest_framework.parsers import JSONParser, FileUploadParser, MultiPartParser
 from rest_framework.views import APIView
 from rest_framework import serializers, status
 
-from checkweb.models import Subject, User, Tutoring
+from checkweb.models import MonthlyBalance, Subject, User, Tutoring, month_range
 
 from django.contrib.auth.models import Group
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from datetime import datetime, date
 import re
 
-from ..serializers import SubjectSerializer, TutoringSerializer, TutoringApiSerializer
-from .views_permissions import IsParticipating, IsTeacher, IsTeaching
+from ..authentication import CachedTokenAuthentication
+from ..pagination import keyset_page
+from ..serializers import (
+    SubjectSerializer,
+    TutoringSerializer,
+    TutoringApiSerializer,
+    save_bulk_tutorings,
+    validate_bulk_tutorings,
+)
+from .views_permissions import IsParticipating, IsTeacher, IsTeaching, load_tutoring
+from checkweb.ledger import month_ledger, monthly_ledger, student_tutorings
+
+
+def is_valid_month(year, month):
+    try:
+        month_range(year, month)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def filter_own_tutorings(user, params):
+    """Own Tutorings (as teacher or student) filtered by the list params of TutoringView
+    and the page size; raises ValueError if a param is invalid"""
+    tuts = Tutoring.objects.filter(Q(teacher=user) | Q(student=user))
+
+    if params.get("teacher"):
+        tuts = tuts.filter(teacher__username=params["teacher"])
+    if params.get("student"):
+        tuts = tuts.filter(student__username=params["student"])
+    if params.get("subject"):
+        tuts = tuts.filter(subject__title=params["subject"])
+    if params.get("paid") in ("true", "false"):
+        tuts = tuts.filter(paid=params["paid"] == "true")
+    if params.get("date_from"):
+        tuts = tuts.filter(date__gte=datetime.strptime(params["date_from"], "%Y-%m-%d"))
+    if params.get("date_to"):
+        tuts = tuts.filter(date__lte=datetime.strptime(params["date_to"], "%Y-%m-%d"))
+    page_size = min(int(params.get("page_size", 50)), 200)
+    if page_size < 1:
+        raise ValueError("page_size must be a positive integer.")
+
+    return tuts.serializable(), page_size
 
 
 class TutoringView(APIView):
     """returns, deletes, updates Tutoring
 
     GET: returns tut if participating
+    GET (without tut_id): returns own tuts, filtered and cursor-paginated
+    POST: creates tut, or all tuts of a list in one transaction
     DELETE: deletes tut if user is teacher of it
     PUT: updates tut if user is teacher of it
     """
 
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     parser_classes = [JSONParser, MultiPartParser, FileUploadParser]
 
     # POSTing a new tut, the teacher can not participate in None
     def get_permissions(self):
         if self.request.method in ["POST"]:
             return [IsTeacher()]
+        if self.request.method == "GET" and self.kwargs.get("tut_id") is None:
+            return [permissions.IsAuthenticated()]
         return [IsTeacher(), IsParticipating()]
 
+    # the Tutoring already loaded by the permission checks
+    def get_object(self):
+        tut = load_tutoring(self)
+        if tut is None:
+            raise Http404
+        return tut
+
     # returns serialized Tutoring
-    def get(self, request, tut_id):
-        tut = get_object_or_404(Tutoring, id=tut_id)
+    def get(self, request, tut_id=None):
+        if tut_id is None:
+            return self.list(request)
+
+        tut = self.get_object()
         return Response(tut.serialize())
 
+    def list(self, request):
+        """returns own Tutorings (as teacher or student), newest first
+
+        Args:
+            OPT teacher, student (str): usernames
+            OPT subject (str): title
+            OPT paid (str): true or false
+            OPT date_from, date_to (str): yyyy-mm-dd, inclusive
+            OPT cursor (str): "next" of the previous page
+            OPT page_size (int): default 50, min 1, max 200
+        """
+
+        params = request.query_params
+
+        try:
+            tuts, page_size = filter_own_tutorings(request.user, params)
+            page, next_cursor = keyset_page(tuts, params.get("cursor"), page_size)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "results": [tut.serialize() for tut in page],
+                "next": next_cursor,
+            }
+        )
+
     def post(self, request):
+        if isinstance(request.data, list):
+            return self.post_many(request)
+
         try:
             tut_serializer = TutoringApiSerializer(data=request.data)
             tut_serializer.is_valid(raise_exception=True)
@@ -55,15 +142,53 @@ class TutoringView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+    def post_many(self, request):
+        """creates all POSTed Tutorings in one transaction, or none if any is invalid
+
+        Args:
+            (list): up to 1000 Tutorings as for a single POST (without pdf)
+        """
+
+        items = request.data
+
+        # Guard: between 1 and 1000 Tutorings
+        if not 0 < len(items) <= 1000:
+            return Response(
+                {"error": "Provide between 1 and 1000 Tutorings."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        tutorings, errors = validate_bulk_tutorings(items)
+
+        # Guard: all Tutorings must be valid
+        if errors:
+            return Response(
+                {
+                    "error": "Invalid Tutorings, none created.",
+                    "errors": [
+                        {"index": index, "errors": errors[index]} for index in sorted(errors)
+                    ],
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            tutorings = save_bulk_tutorings(tutorings)
+
+        return Response(
+            {"created": [tut.serialize() for tut in tutorings]},
+            status=status.HTTP_201_CREATED,
+        )
+
     def delete(self, request, tut_id):
-        tut = get_object_or_404(Tutoring, id=tut_id)
+        tut = self.get_object()
         tut.delete()
         return Response({"message": f"Tutoring session with id {tut_id} has been deleted."})
 
     # updates values in {new_values} if own teacher
     def put(self, request, tut_id):
         # retrieve provided new values
-        tut = get_object_or_404(Tutoring, id=tut_id)
+        tut = self.get_object()
         new_values = request.data.get("new_values", None)
 
         # update Tutoring
@@ -80,28 +205,53 @@ class TutoringView(APIView):
             }
         )
 
+
+def summary_rows(stud, year=None, month=None):
+    """Sums per month of the maintained balances (one row per teacher and month)
+    instead of all Tutorings"""
+    balances = MonthlyBalance.objects.filter(student=stud)
+    if year and month:
+        balances = balances.filter(month=month_range(year, month)[0])
+
+    return (
+        balances.values("month")
+        .annotate(
+            count=Sum("count"),
+            count_unpaid=Sum("count_unpaid"),
+            sum_all=Sum("sum_all"),
+            sum_paid=Sum("sum_paid"),
+            sum_unpaid=Sum("sum_unpaid"),
+        )
+        .order_by("month")
+    )
+
+
+def monthly_summary(rows):
+    """{"yyyy-mm": sums} of the rows of summary_rows"""
+    return {
+        row["month"].strftime("%Y-%m"): {
+            "count": row["count"],
+            "sum_all": row["sum_all"],
+            "sum_paid": row["sum_paid"],
+            "sum_unpaid": row["sum_unpaid"],
+            "is_paid": row["count_unpaid"] == 0,
+        }
+        for row in rows
+    }
+
+
 class TutsPerMonthView(APIView):
     '''GET: returns all Tutorings of student_username grouped by month if provided (else all)'''
 
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def specific_month(self, request, stud: object, year, month):
-        tuts_all = Tutoring.objects.filter(student=stud, date__year=year, date__month=month)
-        tuts_paid = Tutoring.objects.filter(student=stud, paid=True, date__year=year, date__month=month)
-        tuts_unpaid = Tutoring.objects.filter(student=stud, paid=False, date__year=year, date__month=month)
+        tuts = student_tutorings(stud).in_month(year, month)
+        return Response(month_ledger(tuts))
 
-        return Response(
-            {
-                "tuts_all": [tut.serialize() for tut in tuts_all],
-                "tuts_paid": [tut.serialize() for tut in tuts_paid],
-                "tuts_unpaid": [tut.serialize() for tut in tuts_unpaid],
-                "sum_all": sum([tut.price for tut in tuts_all]),
-                "sum_paid": sum([tut.price for tut in tuts_paid]),
-                "sum_unpaid": sum([tut.price for tut in tuts_unpaid]),
-                "is_paid": tuts_unpaid.count() == 0
-            }
-        )
+    def summary(self, request, stud: object, year=None, month=None):
+        return Response(monthly_summary(summary_rows(stud, year, month)))
 
     def get(self, request, student_username, year=None, month=None):
         """returns Tutorings, the number of Tutorings and the sum of money to pay for the provided month
@@ -111,10 +261,11 @@ class TutsPerMonthView(APIView):
             stud_username (str)
             OPT year: (int)
             OPT month (int)
+            OPT ?summary=true: only the aggregated sums per month, without Tutorings
         """
 
         # Guard: block if student tries to view other tuts
-        if (not request.user.groups.filter(name="Teacher").exists()):
+        if not request.user.is_teacher:
             if request.user.username != student_username:
                 return Response(
                     {"error": "You as student may not spectate other Tutorings."},
@@ -122,9 +273,6 @@ class TutsPerMonthView(APIView):
                 )
 
         stud = User.objects.get(username=student_username)
-        tuts = Tutoring.objects.filter(student=stud)
-        collect_yyyy_mm = {}
-        resp = {}
 
         # Guard: preis_pro_45 not set
         if not stud.preis_pro_45:
@@ -133,51 +281,28 @@ class TutsPerMonthView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # if specific month or broken request
-        if year and month:
-            return self.specific_month(request, stud, year, month)
-        elif (not year and month) or (year and not month):
+        # Guard: broken request
+        if (not year and month) or (year and not month):
             return Response(
                 {"error": "Provide year and month both or none of them."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # TODO daaaamn inefficient
-        # TODO testing
-        # group tuts by month and aggregate infos
-        for tut in tuts:
-            collect_yyyy_mm[tut.date.strftime("%Y-%m")] = True
-        for yyyy_mm, tut in collect_yyyy_mm.items():
-            resp[yyyy_mm] = {}
-            resp[yyyy_mm]["tuts_all"] = [tut.serialize()
-                for tut in Tutoring.objects.filter(
-                    student=stud,
-                    date__year=yyyy_mm[:4],
-                    date__month=yyyy_mm[5:7],
-                )
-            ]
-            resp[yyyy_mm]["tuts_paid"] = [
-                tut.serialize()
-                for tut in Tutoring.objects.filter(
-                    student=stud,
-                    date__year=yyyy_mm[:4],
-                    date__month=yyyy_mm[5:7],
-                    paid=True,
-                )
-            ]
-            resp[yyyy_mm]["tuts_unpaid"] = [
-                tut.serialize()
-                for tut in Tutoring.objects.filter(
-                    student=stud,
-                    date__year=yyyy_mm[:4],
-                    date__month=yyyy_mm[5:7],
-                    paid=False,
-                )
-            ]
-            resp[yyyy_mm]["sum_all"] = sum([tut["price"] for tut in resp[yyyy_mm]["tuts_all"]])
-            resp[yyyy_mm]["sum_paid"] = sum([tut["price"] for tut in resp[yyyy_mm]["tuts_paid"]])
-            resp[yyyy_mm]["sum_unpaid"] = sum([tut["price"] for tut in resp[yyyy_mm]["tuts_unpaid"]])
-            resp[yyyy_mm]["is_paid"] = resp[yyyy_mm]["sum_unpaid"] == 0
+        # Guard: year, month must be valid
+        if year and month and not is_valid_month(year, month):
+            return Response(
+                {"error": f"Invalid month: {year}-{month}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # if only sums or specific month
+        if request.query_params.get("summary") == "true":
+            return self.summary(request, stud, year, month)
+        if year and month:
+            return self.specific_month(request, stud, year, month)
+
+        # group tuts by month and aggregate infos in one pass
+        resp = monthly_ledger(student_tutorings(stud))
 
         return Response(resp, status=status.HTTP_200_OK)
 
@@ -200,6 +325,13 @@ class TutsPerMonthView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        # Guard: year, month must be valid
+        if not is_valid_month(data.get("year"), data.get("month")):
+            return Response(
+                {"error": f"Invalid month: {data.get('year')}-{data.get('month')}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         # Guard: student_username must be valid
         if not User.objects.filter(username=student_username).exists():
             return Response(
@@ -210,17 +342,58 @@ class TutsPerMonthView(APIView):
         tuts = Tutoring.objects.filter(
             teacher=request.user,
             student__username=student_username,
-            date__year=data.get("year"),
-            date__month=data.get("month"),
+        ).in_month(data.get("year"), data.get("month"))
+
+        return Response(
+            {
+                "message": f"Success changing paid status of Tutorings.",
+                "new": tuts.settle(data.get("paid")),
+            }
         )
 
-        for tut in tuts:
-            tut.paid = data.get("paid")
-            tut.save()
+
+class SettleView(APIView):
+    """POST: sets paid status of all own Tutorings in multiple (student, year, month) at once"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsTeacher]
+
+    def post(self, request):
+        """Set paid status of all Tutorings of the given months to True/False
+
+        Args:
+            paid (bool)
+            months (list): [[student_username, year, month], ...]
+        """
+
+        data = request.data
+        months = data.get("months")
+
+        # Guard: paid must be boolean
+        if not isinstance(data.get("paid"), bool):
+            return Response(
+                {"error": "paid must be boolean"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Guard: months must be a non-empty list of [student_username, year, month]
+        if (
+            not isinstance(months, list)
+            or not months
+            or not all(
+                isinstance(m, list) and len(m) == 3 and is_valid_month(m[1], m[2]) for m in months
+            )
+        ):
+            return Response(
+                {"error": "months must be a list of [student_username, year, month]"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        tuts = Tutoring.objects.filter(teacher=request.user).of_months(months)
 
         return Response(
             {
                 "message": f"Success changing paid status of Tutorings.",
-                "new": [tut.serialize() for tut in tuts],
+                "new": tuts.settle(data.get("paid")),
             }
         )
@@ -11,6 +11,8 @@ from django.shortcuts import get_object_or_404
 from datetime import datetime, date
 import re
 
+from ..authentication import CachedTokenAuthentication
+from ..caching import versioned_response
 from ..serializers import SubjectSerializer, TutoringSerializer, TutoringApiSerializer
 from .views_permissions import IsParticipating, IsTeacher, IsTeaching
 
@@ -24,13 +26,18 @@ def is_date_valid(date_str):
 
 
 class UserView(APIView):
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsTeacher]
 
     def get(self, request, username=None):
-        # If no user specified, return all usrs
+        # If no user specified, return all usrs (cached until a User or their groups change)
         if not username:
-            return Response([user.serialize() for user in User.objects.all()])
+            return versioned_response(
+                request,
+                "users",
+                [User],
+                lambda: [user.serialize() for user in User.objects.prefetch_related("groups")],
+            )
 
         # If specified, return specific user
         try:
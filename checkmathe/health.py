@@ -0,0 +1,25 @@
+from django.db import connection
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@never_cache
+def healthz(request):
+    """Liveness: the worker answers (no DB, so a DB outage does not restart all workers)"""
+    return JsonResponse({"status": "ok"})
+
+
+@never_cache
+def readyz(request):
+    """Readiness: the worker can serve requests, i.e. reach the DB"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except Exception as e:
+        logger.warning("Not ready, DB unreachable: %s", e)
+        return JsonResponse({"status": "unavailable", "db": str(e)}, status=503)
+    return JsonResponse({"status": "ok"})
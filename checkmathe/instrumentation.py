@@ -0,0 +1,258 @@
+"""Opt-in per-request instrumentation (INSTRUMENTATION=True): wall time, DB queries, DB time,
+response size and DB connections per endpoint, as Server-Timing headers and rolling stats
+(see StatsView); recorded per process, each publishing its stats to the cache (shared between
+the gunicorn workers, see gunicorn.conf.py), so they are reported for the whole server"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from collections import defaultdict, deque
+from threading import Lock, local
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# upper bounds (ms) of the histogram buckets of the wall time
+BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, float("inf")]
+
+_samples = defaultdict(lambda: deque(maxlen=settings.INSTRUMENTATION_WINDOW))
+_lock = Lock()
+
+# seconds between publishing the stats of a process, resp. until those of a process that
+# stopped (e.g. a recycled worker) expire
+PUBLISH_INTERVAL = 5
+PUBLISH_TIMEOUT = 600
+_published = {"at": 0.0, "generation": None}
+_publish_lock = Lock()
+
+# requests of this process that had to open a DB connection resp. reused a persistent one
+_connections = {"opened": 0, "reused": 0}
+_opened = local()
+
+
+@receiver(connection_created)
+def note_connection_opened(sender, connection, **kwargs):
+    _opened.value = True
+
+
+class QueryRecorder:
+    """connection.execute_wrapper recording SQL and duration (ms) of every query"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - start) * 1000))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(duration for sql, duration in self.queries)
+
+    def worst(self, n=3):
+        return sorted(self.queries, key=lambda query: query[1], reverse=True)[:n]
+
+
+def endpoint_name(request):
+    """e.g. "GET api:tutoring"; by route, so all ids of a view count as one endpoint"""
+    match = request.resolver_match
+    view = match.view_name if match else "unresolved"
+    return f"{request.method} {view}"
+
+
+def record(endpoint, duration, queries, db_duration, size, connection_state):
+    with _lock:
+        _samples[endpoint].append((duration, queries, db_duration, size, connection_state))
+        if connection_state:
+            _connections[connection_state] += 1
+    publish()
+
+
+def stats_key(generation, pid="pids"):
+    """Cache key of the stats of the process pid (resp. of the pids publishing) since the reset
+    to generation"""
+    return f"stats:{generation}:{pid}"
+
+
+def snapshot():
+    with _lock:
+        samples = {endpoint: list(window) for endpoint, window in _samples.items()}
+        return {"samples": samples, "connections": dict(_connections)}
+
+
+def publish(force=False):
+    """Shares the stats of this process via the cache, at most every PUBLISH_INTERVAL seconds
+    (unless forced); drops them first if all stats were reset meanwhile, see reset_stats"""
+    if not _publish_lock.acquire(blocking=False):
+        return  # another thread of the process is publishing
+    try:
+        now = time.monotonic()
+        if not force and now - _published["at"] < PUBLISH_INTERVAL:
+            return
+        _published["at"] = now
+
+        generation = cache.get_or_set("stats:generation", 0, timeout=None)
+        if generation != _published["generation"]:
+            if _published["generation"] is not None:
+                clear_stats()
+            _published["generation"] = generation
+
+        pid = os.getpid()
+        cache.set(stats_key(generation, pid), snapshot(), PUBLISH_TIMEOUT)
+
+        # register the pid, forget processes whose stats expired
+        pids = cache.get(stats_key(generation), [])
+        alive = cache.get_many([stats_key(generation, other) for other in pids])
+        pids = [other for other in pids if stats_key(generation, other) in alive]
+        cache.set(stats_key(generation), sorted({*pids, pid}), None)
+    finally:
+        _publish_lock.release()
+
+
+def server_snapshots():
+    """{pid: snapshot} of all processes that published since the last reset, this one current"""
+    publish(force=True)
+    generation = _published["generation"]
+    pids = cache.get(stats_key(generation), [])
+    snapshots = cache.get_many([stats_key(generation, pid) for pid in pids])
+    snapshots = {
+        pid: snapshots[stats_key(generation, pid)]
+        for pid in pids
+        if stats_key(generation, pid) in snapshots
+    }
+    snapshots[os.getpid()] = snapshot()  # also without a cache keeping them (DummyCache)
+    return snapshots
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def endpoint_stats(snapshots):
+    """{endpoint: stats} over the last INSTRUMENTATION_WINDOW requests of each endpoint of each
+    process of the snapshots"""
+    samples = defaultdict(list)
+    for process in snapshots.values():
+        for endpoint, window in process["samples"].items():
+            samples[endpoint] += window
+
+    stats = {}
+    for endpoint, window in sorted(samples.items()):
+        durations = sorted(sample[0] for sample in window)
+        queries = [sample[1] for sample in window]
+        sizes = [sample[3] for sample in window if sample[3] is not None]
+        histogram, lower = {}, 0
+        for upper in BUCKETS_MS:
+            label = f"<{upper:g}ms" if upper != float("inf") else f">={lower:g}ms"
+            histogram[label] = sum(1 for d in durations if lower <= d < upper)
+            lower = upper
+
+        stats[endpoint] = {
+            "count": len(window),
+            "ms_p50": round(percentile(durations, 50), 2),
+            "ms_p95": round(percentile(durations, 95), 2),
+            "ms_p99": round(percentile(durations, 99), 2),
+            "ms_max": round(durations[-1], 2),
+            "queries_mean": round(sum(queries) / len(queries), 2),
+            "queries_max": max(queries),
+            "db_ms_mean": round(sum(sample[2] for sample in window) / len(window), 2),
+            "bytes_mean": round(sum(sizes) / len(sizes)) if sizes else None,
+            "connections_opened": sum(1 for sample in window if sample[4] == "opened"),
+            "connections_reused": sum(1 for sample in window if sample[4] == "reused"),
+            "histogram": histogram,
+        }
+    return stats
+
+
+def connection_stats(snapshots):
+    """Totals of the processes of the snapshots since the last reset; Django keeps one connection
+    per thread (no pool queue), so opening one is the wait a request can have for its connection"""
+    db = connection.settings_dict
+    totals = {
+        state: sum(process["connections"][state] for process in snapshots.values())
+        for state in ["opened", "reused"]
+    }
+    used = totals["opened"] + totals["reused"]
+    return {
+        **totals,
+        "reuse_ratio": round(totals["reused"] / used, 3) if used else None,
+        "conn_max_age": db["CONN_MAX_AGE"],
+        "conn_health_checks": db["CONN_HEALTH_CHECKS"],
+        "server_side_cursors": not db.get("DISABLE_SERVER_SIDE_CURSORS", False),
+    }
+
+
+def clear_stats():
+    with _lock:
+        _samples.clear()
+        _connections.update(opened=0, reused=0)
+
+
+def reset_stats():
+    """Resets the stats of all processes: each drops its own when publishing next"""
+    try:
+        cache.incr("stats:generation")
+    except ValueError:  # not cached yet
+        cache.add("stats:generation", 1, timeout=None)
+    clear_stats()
+    publish(force=True)
+
+
+class InstrumentationMiddleware:
+    """Measures each request; streamed responses only until their first byte"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        _opened.value = False
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        duration = (time.perf_counter() - start) * 1000
+
+        # None if the DB was not used
+        if _opened.value:
+            connection_state = "opened"
+        elif recorder.count:
+            connection_state = "reused"
+        else:
+            connection_state = None
+
+        size = None if response.streaming else len(response.content)
+        endpoint = endpoint_name(request)
+        record(endpoint, duration, recorder.count, recorder.duration, size, connection_state)
+
+        response["Server-Timing"] = (
+            f"app;dur={duration:.1f}, "
+            f'db;dur={recorder.duration:.1f};desc="{recorder.count} queries"'
+        )
+        if connection_state:
+            response["Server-Timing"] += f', db-conn;desc="{connection_state}"'
+
+        if duration >= settings.INSTRUMENTATION_SLOW_MS:
+            worst = "\n".join(f"  {ms:.1f}ms {sql[:500]}" for sql, ms in recorder.worst())
+            logger.warning(
+                "Slow request %s %s: %.0fms, %d queries in %.0fms, worst:\n%s",
+                endpoint,
+                request.get_full_path(),
+                duration,
+                recorder.count,
+                recorder.duration,
+                worst,
+            )
+        return response
@@ -28,6 +28,9 @@ DEBUG = os.getenv('DEBUG', 'False') == 'True'
 LOCAL = os.getenv('LOCAL', 'False') == 'True'
 
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "").split(",")
+# host of health checks from inside the container (docker-compose.yml), see /readyz
+if os.getenv("HEALTHCHECK_HOST"):
+    ALLOWED_HOSTS.append(os.getenv("HEALTHCHECK_HOST"))
 STATIC_ROOT = os.path.join(BASE_DIR, "static/")
 
 
@@ -70,6 +73,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Opt-in: time, queries and size per request as Server-Timing header and stats (GET /api/stats/)
+INSTRUMENTATION = os.getenv("INSTRUMENTATION", "False") == "True"
+INSTRUMENTATION_WINDOW = int(os.getenv("INSTRUMENTATION_WINDOW", "1000"))  # requests per endpoint
+INSTRUMENTATION_SLOW_MS = float(os.getenv("INSTRUMENTATION_SLOW_MS", "500"))  # logged as slow
+if INSTRUMENTATION:
+    MIDDLEWARE.insert(0, "checkmathe.instrumentation.InstrumentationMiddleware")
+
 ROOT_URLCONF = "checkmathe.urls"
 
 TEMPLATES = [
@@ -103,6 +113,19 @@ if not LOCAL:
             "PASSWORD": os.getenv("DB_PASSWORD"),
             "HOST": os.getenv("DB_HOST", "db"),
             "PORT": os.getenv("DB_PORT", "5432"),
+            # reuse connections across requests for that many seconds (0: one per request);
+            # each gunicorn thread holds its own, so max_connections >= workers * threads.
+            # Not under ASGI: each async request runs in a new thread, leaking its connection
+            "CONN_MAX_AGE": (
+                0
+                if os.getenv("SERVER_INTERFACE", "wsgi") == "asgi"
+                else int(os.getenv("DB_CONN_MAX_AGE", "60"))
+            ),
+            # check a reused connection first instead of failing the request if it died
+            "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
+            # DB_HOST is a PgBouncer (transaction pooling): no server-side cursors across
+            # transactions, so .iterator() fetches whole results (e.g. CSV export) instead
+            "DISABLE_SERVER_SIDE_CURSORS": os.getenv("DB_PGBOUNCER", "False") == "True",
         }
     }
     
@@ -116,7 +139,11 @@ if not LOCAL:
     AWS_S3_FILE_OVERWRITE = False
     AWS_DEFAULT_ACL = None
     AWS_S3_VERIFY = True
-    DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
+    # (DEFAULT_FILE_STORAGE is ignored since Django 5.1)
+    STORAGES = {
+        "default": {"BACKEND": "storages.backends.s3boto3.S3Boto3Storage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    }
 else:
     DATABASES = {
         "default": {
@@ -126,6 +153,38 @@ else:
     }
 
 
+# Cache of versioned responses, see api.caching; local memory is per process, so for
+# multiple processes set e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# and CACHE_LOCATION=redis://redis:6379 (as docker-compose.yml does; gunicorn.conf.py refuses
+# several workers on a per-process cache)
+PROCESS_LOCAL_CACHES = [
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+]
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", PROCESS_LOCAL_CACHES[0]),
+        "LOCATION": os.getenv("CACHE_LOCATION", "checkmathe"),
+    }
+}
+# whether all processes see the same cache, e.g. the same model versions
+SHARED_CACHE = CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES
+
+
+# API tokens -> users kept per process, see api.authentication.CachedTokenAuthentication;
+# only by default with a shared cache, else revoking a token would not reach the other processes
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1000"))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "300" if SHARED_CACHE else "0"))  # 0: off
+
+
+# Background processing of uploaded PDFs (0: inline after commit)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+# seconds a presigned PDF up- or download URL is valid, see checkweb.presigned
+PDF_URL_EXPIRY = int(os.getenv("PDF_URL_EXPIRY", "300"))
+# bytes a PDF uploaded via a presigned URL may have
+PDF_MAX_SIZE = int(os.getenv("PDF_MAX_SIZE", str(20 * 1024 * 1024)))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from checkweb import views as checkweb_views
+from checkmathe import health
 from api.views import views_basic as api_views
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
@@ -20,6 +21,8 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("healthz", health.healthz, name="healthz"),
+    path("readyz", health.readyz, name="readyz"),
     path("api/", include("api.urls")),
     
     path("swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
@@ -1,7 +1,9 @@
 from django.contrib import admin
-from .models import User, Subject, Tutoring
+from .models import Invoice, User, Subject, Tutoring, MonthlyBalance
 
 # Register your models here.
 admin.site.register(User)
 admin.site.register(Subject)
 admin.site.register(Tutoring)
+admin.site.register(MonthlyBalance)
+admin.site.register(Invoice)
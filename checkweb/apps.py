@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CheckwebConfig(AppConfig):
@@ -6,4 +7,7 @@ class CheckwebConfig(AppConfig):
     name = "checkweb"
 
     def ready(self):
+        import checkweb.search  # registers its system check
         import checkweb.signals
+
+        post_migrate.connect(checkweb.search.create_fts_triggers, sender=self)
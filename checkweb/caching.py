@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.db import transaction
+
+import time
+
+
+# version of everything token authentication depends on, see api.authentication
+AUTH = "auth"
+
+
+def version_key(model):
+    """Key of the version of a model, or of a name like AUTH"""
+    name = model if isinstance(model, str) else model._meta.label_lower
+    return f"version:{name}"
+
+
+def model_versions(*models):
+    """Current cache version of each model, starting (again) at a timestamp when not cached,
+    so versions never repeat after the cache was cleared"""
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """Invalidates everything cached for the model's version, see model_versions"""
+    try:
+        cache.incr(version_key(model))
+    except ValueError:  # not cached yet
+        cache.add(version_key(model), time.time_ns(), timeout=None)
+
+
+def bump_version_now_and_on_commit(model):
+    """Bumps immediately and again once committed, so nothing read and cached
+    while the transaction was still open stays valid"""
+    bump_version(model)
+    transaction.on_commit(lambda: bump_version(model))
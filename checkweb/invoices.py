@@ -0,0 +1,183 @@
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+
+from .ledger import month_ledger
+from .models import Invoice, MonthlyBalance, Tutoring, month_range
+from .signals import delete_pdf_on_commit
+
+
+def pdf_escape(line):
+    """Line as PDF string literal content, in WinAnsiEncoding (covers umlauts and €)"""
+    text = line.encode("cp1252", errors="replace")
+    return text.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def text_pdf(lines, font_size=11, leading=16, lines_per_page=45):
+    """Minimal PDF with the lines as plain text in Helvetica, A4, as many pages as needed"""
+    pages = [lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # 1: catalog, 2: pages, 3: font, then a page and its content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in pages:
+        stream = b"BT /F1 %d Tf %d TL 56 786 Td " % (font_size, leading)
+        stream += b"".join(b"(" + pdf_escape(line) + b") Tj T* " for line in page) + b"ET"
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects) + 2)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return pdf
+
+
+def invoice_data(teacher, student, month, tuts):
+    """Everything printed on the invoice, as plain (picklable, hashable) data"""
+    ledger = month_ledger(tuts)
+    return {
+        "month": f"{month:%Y-%m}",
+        "teacher": f"{teacher.first_name} {teacher.last_name} ({teacher.username})",
+        "student": f"{student.first_name} {student.last_name} ({student.username})",
+        "student_username": student.username,
+        "tutorings": [
+            [
+                f"{tut['yyyy_mm_dd']:%Y-%m-%d}",
+                tut["subject_title"],
+                tut["duration_in_min"],
+                tut["price"],
+                tut["paid"],
+            ]
+            for tut in ledger["tuts_all"]
+        ],
+        "sum_all": ledger["sum_all"],
+        "sum_paid": ledger["sum_paid"],
+        "sum_unpaid": ledger["sum_unpaid"],
+    }
+
+
+def fingerprint(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def render_invoice(data):
+    """Invoice PDF as bytes; runs in the worker processes, so only plain data in and out"""
+    lines = [
+        f"Invoice {data['month']}",
+        "",
+        f"Teacher: {data['teacher']}",
+        f"Student: {data['student']}",
+        "",
+    ]
+    for day, subject, duration, price, paid in data["tutorings"]:
+        state = "paid" if paid else "open"
+        lines.append(f"{day}   {subject}, {duration} min   {price:.2f}€   {state}")
+    lines += [
+        "",
+        f"Total: {data['sum_all']:.2f}€",
+        f"Paid: {data['sum_paid']:.2f}€",
+        f"Open: {data['sum_unpaid']:.2f}€",
+    ]
+    return text_pdf(lines)
+
+
+def stale_invoices(teacher, months=None):
+    """[(Invoice, data)] of all (student, month) of the teacher whose invoice is missing or outdated;
+    only months whose balance was refreshed since their invoice was made from it (any change of
+    their Tutorings, the student's price or the names) are loaded and fingerprinted"""
+    invoices = {invoice.key: invoice for invoice in Invoice.objects.filter(teacher=teacher)}
+
+    balances = MonthlyBalance.objects.filter(teacher=teacher)
+    if months:
+        balances = balances.filter(month__in=months)
+    # the balance's own modified as version, not compared to another clock
+    balance_modified = {
+        balance.key: balance.modified
+        for balance in balances.only("student_id", "teacher_id", "month", "modified")
+        if balance.key not in invoices
+        or balance.modified != invoices[balance.key].balance_modified
+    }
+    if not balance_modified:
+        return []
+    keys = set(balance_modified)
+
+    # all Tutorings of the changed months in one query, with the names printed on the invoice
+    tuts_by_key = {key: [] for key in keys}
+    first, last = min(key[2] for key in keys), max(key[2] for key in keys)
+    tuts = Tutoring.objects.filter(
+        teacher=teacher,
+        student_id__in={key[0] for key in keys},
+        date__gte=first,
+        date__lt=month_range(last.year, last.month)[1],
+    )
+    for tut in tuts.serializable("student__first_name", "student__last_name").order_by(
+        "date", "id"
+    ):
+        key = tut.balance_key
+        if key in tuts_by_key:
+            tuts_by_key[key].append(tut)
+
+    stale, unchanged = [], []
+    for key in sorted(keys, key=lambda key: (key[2], key[0])):
+        student_id, teacher_id, month = key
+        if not tuts_by_key[key]:
+            continue
+        student = tuts_by_key[key][0].student
+        data = invoice_data(teacher, student, month, tuts_by_key[key])
+        invoice = invoices.get(key) or Invoice(student_id=student_id, teacher=teacher, month=month)
+        invoice.balance_modified = balance_modified[key]
+        if invoice.fingerprint != fingerprint(data):
+            stale.append((invoice, data))
+        else:
+            unchanged.append(invoice)
+
+    # not fingerprinted again until their balance changes
+    Invoice.objects.bulk_update(unchanged, ["balance_modified"])
+    return stale
+
+
+def generate_invoices(teacher, months=None, workers=1):
+    """(Re)generates the invoice PDFs of the teacher's students whose Tutorings changed,
+    rendered on a pool of worker processes; returns the generated Invoices"""
+    stale = stale_invoices(teacher, months)
+    datas = [data for invoice, data in stale]
+
+    if workers > 1 and len(datas) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pdfs = list(pool.map(render_invoice, datas, chunksize=8))
+    else:
+        pdfs = [render_invoice(data) for data in datas]
+
+    # storing stays in this process: storage and database connection are not shared
+    for (invoice, data), pdf in zip(stale, pdfs):
+        with transaction.atomic():
+            old_name = invoice.pdf.name
+            name = f"{data['student_username']}_{data['month']}.pdf"
+            invoice.pdf.save(name, ContentFile(pdf), save=False)
+            invoice.fingerprint = fingerprint(data)
+            invoice.save()
+            if old_name:
+                delete_pdf_on_commit(invoice.pdf.storage, old_name)
+    return [invoice for invoice, data in stale]
@@ -0,0 +1,64 @@
+from .models import Tutoring
+
+
+def empty_month():
+    """Returns a fresh ledger entry for one month"""
+    return {
+        "tuts_all": [],
+        "tuts_paid": [],
+        "tuts_unpaid": [],
+        "sum_all": 0,
+        "sum_paid": 0,
+        "sum_unpaid": 0,
+        "is_paid": True,
+    }
+
+
+def add_to_month(entry, tut):
+    """Books one Tutoring into the ledger entry of its month"""
+    serialized = tut.serialize()
+    state = "paid" if tut.paid else "unpaid"
+
+    entry["tuts_all"].append(serialized)
+    entry[f"tuts_{state}"].append(serialized)
+    entry["sum_all"] += serialized["price"]
+    entry[f"sum_{state}"] += serialized["price"]
+    if not tut.paid:
+        entry["is_paid"] = False
+
+
+def student_tutorings(stud, **filters):
+    """All Tutorings of stud in one query, ordered by date and with related rows joined"""
+    return Tutoring.objects.filter(student=stud, **filters).serializable().order_by("date", "id")
+
+
+def month_ledger(tuts):
+    """Builds a single ledger entry over all given Tutorings"""
+    entry = empty_month()
+    for tut in tuts:
+        add_to_month(entry, tut)
+    return entry
+
+
+def monthly_ledger(tuts):
+    """Builds {"yyyy-mm": ledger entry} in one pass over Tutorings ordered by date"""
+    ledger = {}
+    for tut in tuts:
+        yyyy_mm = tut.date.strftime("%Y-%m")
+        if yyyy_mm not in ledger:
+            ledger[yyyy_mm] = empty_month()
+        add_to_month(ledger[yyyy_mm], tut)
+    return ledger
+
+
+def history_months(tuts):
+    """Groups Tutorings into {first day of month: {"count", "tutorings", "sum_money"}} in one pass"""
+    months = {}
+    for tut in tuts:
+        month = tut.date.replace(day=1)
+        if month not in months:
+            months[month] = {"count": 0, "tutorings": [], "sum_money": 0}
+        months[month]["count"] += 1
+        months[month]["tutorings"].append(tut)
+        months[month]["sum_money"] += tut.price
+    return months
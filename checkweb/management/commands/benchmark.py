@@ -0,0 +1,187 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+import json
+import time
+
+from checkmathe.instrumentation import percentile
+from checkweb.models import Tutoring, User
+
+from .seed_benchmark_data import PREFIX
+
+
+def pick_users(username=None):
+    """Teacher, their student with the most Tutorings and the student's latest Tutoring"""
+    # Guard: only seeded users, the benchmarks write (paid status, Tutorings)
+    if username and not username.startswith(PREFIX):
+        raise CommandError(f"Only seeded teachers ({PREFIX}...) can be benchmarked.")
+
+    teachers = User.objects.filter(groups__name="Teacher", username__startswith=PREFIX)
+    if username:
+        teachers = teachers.filter(username=username)
+    teacher = (
+        teachers.annotate(n=Count("teaching_tutorings")).filter(n__gt=0).order_by("-n").first()
+    )
+    if teacher is None:
+        raise CommandError("No teacher with Tutorings, seed via seed_benchmark_data first.")
+
+    busiest = (
+        Tutoring.objects.filter(teacher=teacher)
+        .values("student")
+        .annotate(n=Count("id"))
+        .order_by("-n")
+        .first()
+    )
+    student = User.objects.get(id=busiest["student"])
+    tut = Tutoring.objects.filter(teacher=teacher, student=student).latest("date", "id")
+    return teacher, student, tut
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the hot endpoints on the benchmark data (see seed_benchmark_data), "
+        "reports p50/p95 and queries and compares them to a saved baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=30, help="timed requests per endpoint"
+        )
+        parser.add_argument("--warmup", type=int, default=3, help="untimed requests per endpoint")
+        parser.add_argument(
+            "--teacher", help=f"seeded username, default the busiest {PREFIX}teacher"
+        )
+        parser.add_argument("--save", help="write the results as JSON baseline to this file")
+        parser.add_argument("--baseline", help="JSON baseline to compare the results with")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20,
+            help="%% slower p95 or more queries is a regression",
+        )
+        parser.add_argument(
+            "--fail-on-regression", action="store_true", help="exit with an error on regressions"
+        )
+
+    def handle(self, *args, **options):
+        teacher, student, tut = pick_users(options["teacher"])
+        token = Token.objects.get(user=teacher).key
+        api = Client(HTTP_AUTHORIZATION=f"Token {token}")
+        web = Client()
+        web.force_login(teacher)
+
+        year, month = f"{tut.date:%Y}", f"{tut.date:%m}"
+        paid = {"value": False}
+
+        def toggle_paid():
+            paid["value"] = not paid["value"]
+            return api.post(
+                reverse("api:tuts_per_month", args=[student.username]),
+                {"paid": paid["value"], "year": year, "month": month},
+                content_type="application/json",
+            )
+
+        endpoints = {
+            "tuts_per_month": lambda: api.get(
+                reverse("api:tuts_per_month", args=[student.username])
+            ),
+            "tuts_per_month_month": lambda: api.get(
+                reverse("api:tuts_per_month", args=[student.username, year, month])
+            ),
+            "tuts_per_month_summary": lambda: api.get(
+                reverse("api:tuts_per_month", args=[student.username]), {"summary": "true"}
+            ),
+            "history_view": lambda: web.get(reverse("checkweb:history_view")),
+            "tutoring_detail": lambda: api.get(reverse("api:tutoring", args=[tut.id])),
+            "user_list": lambda: api.get(reverse("api:user")),
+            "paid_status_post": toggle_paid,
+        }
+
+        self.stdout.write(
+            f"{teacher.username}, {student.username}: "
+            f"{Tutoring.objects.filter(teacher=teacher).count()} Tutorings of the teacher, "
+            f"{Tutoring.objects.count()} in total"
+        )
+
+        # paid status of the toggled month, restored afterwards
+        toggled = Tutoring.objects.filter(teacher=teacher, student=student).in_month(year, month)
+        paid_before = list(toggled.values_list("id", "paid"))
+
+        results = {}
+        try:
+            # the test Client's host
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                for name, request in endpoints.items():
+                    results[name] = self.measure(
+                        name, request, options["iterations"], options["warmup"]
+                    )
+                    self.stdout.write(
+                        f"{name:<24} p50 {results[name]['p50_ms']:>9.1f}ms"
+                        f"  p95 {results[name]['p95_ms']:>9.1f}ms"
+                        f"  {results[name]['queries']:>4} queries"
+                    )
+        finally:
+            for paid in [True, False]:
+                ids = [tut_id for tut_id, was_paid in paid_before if was_paid == paid]
+                Tutoring.objects.filter(id__in=ids).settle(paid)
+
+        if options["save"]:
+            with open(options["save"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Saved baseline to {options['save']}.")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            regressions = self.compare(results, baseline, options["threshold"])
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"Regressions: {', '.join(regressions)}")
+
+    def measure(self, name, request, iterations, warmup):
+        for i in range(warmup):
+            request()
+
+        durations, queries = [], []
+        for i in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = request()
+                durations.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+            if response.status_code >= 400:
+                raise CommandError(f"{name}: HTTP {response.status_code}")
+
+        durations.sort()
+        return {
+            "p50_ms": round(percentile(durations, 50), 2),
+            "p95_ms": round(percentile(durations, 95), 2),
+            "queries": max(queries),
+        }
+
+    def compare(self, results, baseline, threshold):
+        """Prints the changes against the baseline, returns the names of the regressed endpoints"""
+        self.stdout.write(
+            f"\nCompared to baseline (regression: p95 +{threshold:g}% or more queries):"
+        )
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                self.stdout.write(f"{name:<24} new")
+                continue
+            before = baseline[name]
+            change = (result["p95_ms"] - before["p95_ms"]) / max(before["p95_ms"], 0.01) * 100
+            regressed = change >= threshold or result["queries"] > before["queries"]
+            if regressed:
+                regressions.append(name)
+            self.stdout.write(
+                f"{name:<24} p95 {before['p95_ms']:>9.1f} -> {result['p95_ms']:>9.1f}ms ({change:+.0f}%)"
+                f"  queries {before['queries']:>4} -> {result['queries']:>4}"
+                + ("  REGRESSION" if regressed else "")
+            )
+        return regressions
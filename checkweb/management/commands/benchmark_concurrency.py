@@ -0,0 +1,124 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import json
+import random
+import time
+import uuid
+
+from checkmathe.instrumentation import percentile
+
+from .benchmark import pick_users
+from .seed_benchmark_data import PREFIX
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends concurrent mixed PDF upload and read traffic to running servers, once to the sync "
+        "API (api/) and once to the async one (api/async/), and reports throughput and p50/p95; "
+        "start both with the same number of processes, e.g. WEB_WORKERS=2 with SERVER_INTERFACE "
+        "wsgi resp. asgi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sync-url", default="http://localhost:8000/api/")
+        parser.add_argument("--async-url", default="http://localhost:8001/api/async/")
+        parser.add_argument("--teacher", help=f"username, default the busiest {PREFIX}teacher")
+        parser.add_argument("--concurrency", type=int, default=32, help="requests in flight")
+        parser.add_argument("--requests", type=int, default=500, help="requests per server")
+        parser.add_argument("--upload-ratio", type=float, default=0.2, help="share of uploads")
+        parser.add_argument("--upload-kb", type=int, default=512, help="size of an uploaded pdf")
+
+    def handle(self, *args, **options):
+        teacher, student, tut = pick_users(options["teacher"])
+        self.token = Token.objects.get(user=teacher).key
+        self.pdf = b"%PDF-1.4\n" + b"0" * (options["upload_kb"] * 1024)
+        self.tut = tut
+
+        random.seed(0)  # same traffic for both servers
+        kinds = [
+            "upload" if random.random() < options["upload_ratio"] else "read"
+            for i in range(options["requests"])
+        ]
+
+        results = {}
+        for name in ["sync", "async"]:
+            base = options[f"{name}_url"]
+            self.request(base, 0, "read")  # warm up, fails early if the server is down
+            start = time.perf_counter()
+            with ThreadPoolExecutor(options["concurrency"]) as pool:
+                samples = list(pool.map(lambda args: self.request(base, *args), enumerate(kinds)))
+            elapsed = time.perf_counter() - start
+            self.cleanup(base, [created for kind, ms, created in samples if created])
+
+            results[name] = elapsed
+            self.stdout.write(f"{name:<6} {len(kinds) / elapsed:>8.1f} req/s")
+            for kind in ["read", "upload"]:
+                durations = sorted(ms for k, ms, created in samples if k == kind)
+                if durations:
+                    self.stdout.write(
+                        f"  {kind:<7} {len(durations):>5}  p50 {percentile(durations, 50):>9.1f}ms"
+                        f"  p95 {percentile(durations, 95):>9.1f}ms"
+                    )
+
+        self.stdout.write(f"async throughput: {results['sync'] / results['async']:.2f}x of sync")
+
+    def request(self, base, i, kind):
+        """(kind, ms, id of the created Tutoring or None)"""
+        headers = {"Authorization": f"Token {self.token}"}
+        if kind == "upload":
+            boundary = uuid.uuid4().hex
+            fields = {
+                "subject_title": self.tut.subject.title,
+                "yyyy_mm_dd": f"{self.tut.date:%Y-%m-%d}",
+                "duration_in_min": "45",
+                "teacher_username": self.tut.teacher.username,
+                "student_username": self.tut.student.username,
+                "content": f"{PREFIX}concurrency",
+            }
+            body = b"".join(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n'
+                f"{value}\r\n".encode()
+                for key, value in fields.items()
+            )
+            body += (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="pdf"; '
+                f'filename="{PREFIX}{i}.pdf"\r\nContent-Type: application/pdf\r\n\r\n'
+            ).encode()
+            body += self.pdf + f"\r\n--{boundary}--\r\n".encode()
+            headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+            req = Request(f"{base}tutoring/", data=body, headers=headers, method="POST")
+        elif i % 2:
+            req = Request(f"{base}tutoring/{self.tut.id}/", headers=headers)
+        else:
+            req = Request(
+                f"{base}tuts_per_month/{self.tut.student.username}/"
+                f"{self.tut.date:%Y}/{self.tut.date:%m}/",
+                headers=headers,
+            )
+
+        start = time.perf_counter()
+        try:
+            with urlopen(req) as response:
+                data = response.read()
+        except HTTPError as e:
+            raise CommandError(f"{req.method} {req.full_url}: HTTP {e.code}")
+        except OSError as e:
+            raise CommandError(f"{req.method} {req.full_url}: {e}")
+        duration = (time.perf_counter() - start) * 1000
+
+        return kind, duration, json.loads(data)["id"] if kind == "upload" else None
+
+    def cleanup(self, base, ids):
+        """Deletes the uploaded Tutorings via the API they were uploaded to"""
+        for tut_id in ids:
+            req = Request(
+                f"{base}tutoring/{tut_id}/",
+                headers={"Authorization": f"Token {self.token}"},
+                method="DELETE",
+            )
+            with urlopen(req):
+                pass
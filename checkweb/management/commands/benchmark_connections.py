@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+import time
+
+from checkmathe.instrumentation import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Times requests opening a new DB connection each (CONN_MAX_AGE=0) against the configured "
+        "connection lifecycle (CONN_MAX_AGE, CONN_HEALTH_CHECKS), to show the per-request saving"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200, help="timed requests per mode")
+        parser.add_argument("--path", default="/readyz", help="requested path, default one query")
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite":
+            self.stdout.write("Note: SQLite opens a file, not a network connection; use Postgres.")
+        configured = connection.settings_dict["CONN_MAX_AGE"]
+        if not configured:
+            self.stdout.write("Note: CONN_MAX_AGE is 0, set DB_CONN_MAX_AGE to compare.")
+
+        # the full handler, not the test Client: only it opens and closes connections on
+        # request_started / request_finished as configured (and health checks them)
+        handler = WSGIHandler()
+        environ = RequestFactory().get(options["path"]).environ
+        results = {}
+        # RequestFactory's host
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for mode, max_age in [("new", 0), ("configured", configured)]:
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+                try:
+                    self.request(handler, environ, options["path"])  # warm up Django itself
+                    durations = []
+                    for i in range(options["iterations"]):
+                        start = time.perf_counter()
+                        self.request(handler, environ, options["path"])
+                        durations.append((time.perf_counter() - start) * 1000)
+                finally:
+                    connection.settings_dict["CONN_MAX_AGE"] = configured
+
+                durations.sort()
+                results[mode] = {
+                    "mean": sum(durations) / len(durations),
+                    "p50": percentile(durations, 50),
+                    "p95": percentile(durations, 95),
+                }
+                self.stdout.write(
+                    f"{mode:<11} connection: mean {results[mode]['mean']:>7.2f}ms"
+                    f"  p50 {results[mode]['p50']:>7.2f}ms  p95 {results[mode]['p95']:>7.2f}ms"
+                )
+
+        saving = results["new"]["mean"] - results["configured"]["mean"]
+        self.stdout.write(
+            f"Saving per request by the configured connections: {saving:.2f}ms (CONN_MAX_AGE "
+            f"{configured}, CONN_HEALTH_CHECKS {connection.settings_dict['CONN_HEALTH_CHECKS']})"
+        )
+
+    def request(self, handler, environ, path):
+        statuses = []
+        response = handler(dict(environ), lambda status, headers: statuses.append(status))
+        try:
+            b"".join(response)
+        finally:
+            response.close()  # request_finished
+        if int(statuses[0].split()[0]) >= 400:
+            raise CommandError(f"{path}: HTTP {statuses[0]}")
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from datetime import timedelta
+
+from checkweb.models import Tutoring
+from checkweb.presigned import delete_orphaned_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes uploaded PDFs no Tutoring refers to after some minutes, as uploads via a "
+        "presigned URL that were never confirmed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=60, help="minutes since upload")
+
+    def handle(self, *args, **options):
+        older_than = timedelta(minutes=options["older_than"])
+
+        # Guard: uploads may be confirmed until twice the URL expiry
+        if older_than.total_seconds() < 2 * settings.PDF_URL_EXPIRY:
+            raise CommandError(
+                f"--older-than must cover the {2 * settings.PDF_URL_EXPIRY} seconds uploads "
+                "can still be confirmed."
+            )
+
+        deleted = delete_orphaned_uploads(Tutoring._meta.get_field("pdf"), older_than)
+        self.stdout.write(f"Deleted {len(deleted)} orphaned PDFs.")
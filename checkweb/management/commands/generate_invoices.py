@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from datetime import datetime
+import os
+
+from checkweb.invoices import generate_invoices
+from checkweb.models import User
+
+
+class Command(BaseCommand):
+    help = "Generates the invoice PDFs per student and month whose Tutorings changed since"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--teacher", action="append", help="username; repeatable, default all teachers"
+        )
+        parser.add_argument("--month", action="append", help="yyyy-mm; repeatable, default all")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="processes rendering the PDFs (1: render inline)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            months = [datetime.strptime(m, "%Y-%m").date() for m in options["month"] or []]
+        except ValueError as e:
+            raise CommandError(f"Invalid month: {e}")
+
+        teachers = User.objects.filter(groups__name="Teacher").order_by("username")
+        if options["teacher"]:
+            teachers = teachers.filter(username__in=options["teacher"])
+
+        for teacher in teachers:
+            invoices = generate_invoices(teacher, months, workers=options["workers"])
+            self.stdout.write(f"{teacher.username}: generated {len(invoices)} invoices.")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from datetime import timedelta
+
+from checkweb.pdf_processing import reschedule_stale_pdfs
+
+
+class Command(BaseCommand):
+    help = (
+        "Processes the uploaded PDFs still pending after some minutes, as their background job "
+        "was lost with its worker process (recycle, deploy, crash)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, default=10, help="minutes pending, 0: all pending PDFs"
+        )
+
+    def handle(self, *args, **options):
+        count = reschedule_stale_pdfs(timedelta(minutes=options["older_than"]), inline=True)
+        self.stdout.write(f"Processed {count} pending PDFs.")
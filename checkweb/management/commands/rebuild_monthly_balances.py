@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from checkweb.models import MonthlyBalance
+
+
+class Command(BaseCommand):
+    help = "Recomputes all MonthlyBalances from the Tutorings"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            MonthlyBalance.objects.rebuild()
+        self.stdout.write(f"Rebuilt {MonthlyBalance.objects.count()} monthly balances.")
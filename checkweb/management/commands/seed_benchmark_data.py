@@ -0,0 +1,128 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from datetime import timedelta
+import random
+
+from checkweb.models import MonthlyBalance, Subject, Tutoring, User
+
+# all benchmark users start with it, see benchmark
+PREFIX = "bench_"
+
+TOPICS = [
+    "Satz des Pythagoras an Beispielaufgaben geübt.",
+    "Redoxgleichungen und Oxidationszahlen wiederholt.",
+    "Lineare Funktionen: Steigung und Achsenabschnitt.",
+    "Vokabeln und unregelmäßige Verben abgefragt.",
+    "Textaufgaben zur Prozentrechnung besprochen.",
+    "Klausurvorbereitung: alte Aufgaben durchgerechnet.",
+    "Bruchrechnung und Kürzen vertieft.",
+    "Gedichtanalyse Schritt für Schritt.",
+]
+
+
+class Command(BaseCommand):
+    help = "Creates benchmark users (username bench_...) with randomly spread Tutorings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teachers", type=int, default=200)
+        parser.add_argument("--students", type=int, default=5000)
+        parser.add_argument("--tutorings", type=int, default=2_000_000)
+        parser.add_argument(
+            "--years", type=int, default=5, help="Tutorings spread over the past years"
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=42, help="same seed, same data")
+        parser.add_argument(
+            "--flush", action="store_true", help="delete existing benchmark data first"
+        )
+
+    def handle(self, *args, **options):
+        bench_users = User.objects.filter(username__startswith=PREFIX)
+        if options["flush"]:
+            self.flush(bench_users)
+        elif bench_users.exists():
+            raise CommandError("Benchmark data exists already, use --flush to replace it.")
+
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            teachers = self.create_users("teacher", options["teachers"], "Teacher", rng)
+            students = self.create_users("student", options["students"], "Student", rng)
+        self.stdout.write(f"Created {len(teachers)} teachers, {len(students)} students.")
+
+        # every student learns with one or two teachers
+        pairs = [
+            (student.id, teacher.id)
+            for student in students
+            for teacher in rng.sample(teachers, min(len(teachers), rng.choice([1, 1, 2])))
+        ]
+        subject_ids = list(Subject.objects.values_list("id", flat=True))
+        today = timezone.now().date()
+        recent = today - timedelta(days=60)
+
+        created = 0
+        while created < options["tutorings"]:
+            batch = []
+            for i in range(min(options["batch_size"], options["tutorings"] - created)):
+                student_id, teacher_id = rng.choice(pairs)
+                day = today - timedelta(days=rng.randrange(options["years"] * 365))
+                batch.append(
+                    Tutoring(
+                        date=day,
+                        duration=rng.choice([45, 45, 60, 90]),
+                        subject_id=rng.choice(subject_ids),
+                        teacher_id=teacher_id,
+                        student_id=student_id,
+                        content=rng.choice(TOPICS),
+                        # mostly paid unless recent
+                        paid=day < recent and rng.random() < 0.95,
+                    )
+                )
+            with transaction.atomic():
+                Tutoring.objects.bulk_create(batch)
+            created += len(batch)
+            self.stdout.write(f"Created {created} Tutorings.")
+
+        # bulk_create skips the signals keeping the balances up to date
+        with transaction.atomic():
+            MonthlyBalance.objects.rebuild()
+        self.stdout.write("Rebuilt monthly balances.")
+
+    def create_users(self, role, n, group_name, rng):
+        """Creates n Users (with Group and Token) at once, all with the password "password\" """
+        password = make_password("password")
+        users = User.objects.bulk_create(
+            User(
+                username=f"{PREFIX}{role}_{i:05}",
+                email=f"{PREFIX}{role}_{i:05}@mail.de",
+                first_name=role.capitalize(),
+                last_name=f"{i:05}",
+                password=password,
+                preis_pro_45=rng.choice([20, 25, 30, 35]) if role == "student" else None,
+            )
+            for i in range(n)
+        )
+
+        group = Group.objects.get(name=group_name)
+        User.groups.through.objects.bulk_create(
+            User.groups.through(user_id=user.id, group_id=group.id) for user in users
+        )
+        Token.objects.bulk_create(Token(key=Token.generate_key(), user=user) for user in users)
+        return users
+
+    def flush(self, bench_users):
+        # raw, so millions of Tutorings are not loaded for their delete signals
+        user_ids, params = bench_users.values("id").query.sql_with_params()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Tutoring._meta.db_table} "
+                f"WHERE teacher_id IN ({user_ids}) OR student_id IN ({user_ids})",
+                params * 2,
+            )
+            bench_users.delete()
+            MonthlyBalance.objects.rebuild()
+        self.stdout.write("Deleted existing benchmark data.")
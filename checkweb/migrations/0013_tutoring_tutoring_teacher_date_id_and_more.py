@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkweb', '0012_delete_fileupload_tutoring_paid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tutoring',
+            index=models.Index(fields=['teacher', 'date', 'id'], name='tutoring_teacher_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='tutoring',
+            index=models.Index(fields=['student', 'date', 'id'], name='tutoring_student_date_id'),
+        ),
+    ]
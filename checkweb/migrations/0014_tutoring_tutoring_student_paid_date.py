@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkweb', '0013_tutoring_tutoring_teacher_date_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tutoring',
+            index=models.Index(fields=['student', 'paid', 'date'], name='tutoring_student_paid_date'),
+        ),
+    ]
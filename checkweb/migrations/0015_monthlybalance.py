@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_balances(apps, schema_editor):
+    """Initial MonthlyBalances of the existing Tutorings"""
+    Tutoring = apps.get_model("checkweb", "Tutoring")
+    MonthlyBalance = apps.get_model("checkweb", "MonthlyBalance")
+
+    balances = {}
+    for tut in Tutoring.objects.select_related("student").iterator(chunk_size=2000):
+        key = (tut.student_id, tut.teacher_id, tut.date.replace(day=1))
+        if key not in balances:
+            balances[key] = MonthlyBalance(student_id=key[0], teacher_id=key[1], month=key[2])
+        balance = balances[key]
+
+        preis = tut.student.preis_pro_45
+        price = -9999 if preis is None else round(preis * (tut.duration / 45), 2)
+        balance.count += 1
+        balance.minutes += tut.duration
+        balance.sum_all += price
+        if tut.paid:
+            balance.sum_paid += price
+        else:
+            balance.count_unpaid += 1
+            balance.sum_unpaid += price
+
+    MonthlyBalance.objects.bulk_create(balances.values(), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkweb', '0014_tutoring_tutoring_student_paid_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('count_unpaid', models.PositiveIntegerField(default=0)),
+                ('minutes', models.PositiveIntegerField(default=0)),
+                ('sum_all', models.FloatField(default=0)),
+                ('sum_paid', models.FloatField(default=0)),
+                ('sum_unpaid', models.FloatField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'teacher', 'month'), name='monthly_balance_unique')],
+            },
+        ),
+        migrations.RunPython(build_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkweb', '0016_tutoring_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tutoring',
+            name='pdf_pages',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tutoring',
+            name='pdf_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('valid', 'Valid'), ('invalid', 'Invalid')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='tutoring',
+            name='pdf_text',
+            field=models.TextField(blank=True),
+        ),
+    ]
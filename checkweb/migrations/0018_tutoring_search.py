@@ -0,0 +1,70 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# SQLite: FTS5 table over content and pdf_text, kept in sync by triggers.
+# NOTE: SQLite migrations that rebuild checkweb_tutoring drop these triggers; they are re-created
+# after migrate by checkweb.search.create_fts_triggers.
+SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE checkweb_tutoring_fts USING fts5(
+        content, pdf_text, content='checkweb_tutoring', content_rowid='id'
+    )""",
+    """CREATE TRIGGER checkweb_tutoring_fts_insert AFTER INSERT ON checkweb_tutoring BEGIN
+        INSERT INTO checkweb_tutoring_fts(rowid, content, pdf_text)
+        VALUES (new.id, new.content, new.pdf_text);
+    END""",
+    """CREATE TRIGGER checkweb_tutoring_fts_delete AFTER DELETE ON checkweb_tutoring BEGIN
+        INSERT INTO checkweb_tutoring_fts(checkweb_tutoring_fts, rowid, content, pdf_text)
+        VALUES ('delete', old.id, old.content, old.pdf_text);
+    END""",
+    """CREATE TRIGGER checkweb_tutoring_fts_update AFTER UPDATE OF content, pdf_text
+    ON checkweb_tutoring BEGIN
+        INSERT INTO checkweb_tutoring_fts(checkweb_tutoring_fts, rowid, content, pdf_text)
+        VALUES ('delete', old.id, old.content, old.pdf_text);
+        INSERT INTO checkweb_tutoring_fts(rowid, content, pdf_text)
+        VALUES (new.id, new.content, new.pdf_text);
+    END""",
+    "INSERT INTO checkweb_tutoring_fts(checkweb_tutoring_fts) VALUES ('rebuild')",
+]
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER checkweb_tutoring_fts_update",
+    "DROP TRIGGER checkweb_tutoring_fts_delete",
+    "DROP TRIGGER checkweb_tutoring_fts_insert",
+    "DROP TABLE checkweb_tutoring_fts",
+]
+
+
+def search_index():
+    # same expression as checkweb.search.SEARCH_VECTOR, else not used by the planner
+    return GinIndex(
+        SearchVector("content", "pdf_text", config="simple"), name="tutoring_search_gin"
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("checkweb", "Tutoring"), search_index())
+    elif vendor == "sqlite":
+        for sql in SQLITE_FTS:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("checkweb", "Tutoring"), search_index())
+    elif vendor == "sqlite":
+        for sql in SQLITE_FTS_DROP:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkweb', '0017_tutoring_pdf_pages_tutoring_pdf_status_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
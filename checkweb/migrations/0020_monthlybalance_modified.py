@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkweb', '0019_invoice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlybalance',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("checkweb", "0020_monthlybalance_modified"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="balance_modified",
+            field=models.DateTimeField(
+                help_text="modified of the MonthlyBalance the invoice was last checked against.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("checkweb", "0022_feedtoken"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TutoringSearchIndex",
+            fields=[
+                (
+                    "tutoring",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_index",
+                        serialize=False,
+                        to="checkweb.tutoring",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "checkweb_tutoring_fts",
+                "managed": False,
+            },
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import BooleanField, Case, Count, DecimalField, ExpressionWrapper, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Round, TruncMonth
 from django.contrib.auth.models import AbstractUser, Group
 from django.core.validators import MinValueValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
@@ -6,6 +8,7 @@ from rest_framework.authtoken.models import Token
 from django.utils import timezone
 from django.urls import reverse
 from datetime import date, datetime
+import secrets
 
 
 class User(AbstractUser):
@@ -14,6 +17,34 @@ class User(AbstractUser):
     
     REQUIRED_FIELDS = ['first_name', 'last_name', 'email']
 
+    # price as loaded from the DB, to only recompute MonthlyBalances if it changed
+    loaded_preis_pro_45 = None
+    # auth_fields as loaded from the DB, to only invalidate cached authentication if changed
+    loaded_auth_fields = None
+    # name_fields as loaded from the DB, to only outdate invoices if changed
+    loaded_name_fields = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        if "preis_pro_45" in field_names:
+            user.loaded_preis_pro_45 = user.preis_pro_45
+        if {"username", "is_active"} <= set(field_names):
+            user.loaded_auth_fields = user.auth_fields
+        if {"username", "first_name", "last_name"} <= set(field_names):
+            user.loaded_name_fields = user.name_fields
+        return user
+
+    @property
+    def auth_fields(self):
+        """Fields token authentication depends on (besides the groups)"""
+        return (self.username, self.is_active)
+
+    @property
+    def name_fields(self):
+        """Fields printed on invoices"""
+        return (self.username, self.first_name, self.last_name)
+
     def __str__(self):
         return f"[{self.id}] {self.username}"
 
@@ -23,11 +54,39 @@ class User(AbstractUser):
             raise ValidationError("Username, first name, last name, and email are required fields.")
 
         super().save(*args, **kwargs)
+        self.loaded_preis_pro_45 = self.preis_pro_45
+        self.loaded_auth_fields = self.auth_fields
+        self.loaded_name_fields = self.name_fields
 
         # Student as default group
         if self.id and not self.groups.exists():
             self.groups.add(Group.objects.get(name="Student"))
 
+    @property
+    def group_names(self):
+        """Names of the User's Groups (ordered by pk), cached on the instance;
+        uses prefetched groups if available, forgotten when the groups change"""
+        if not hasattr(self, "_group_names"):
+            groups = sorted(self.groups.all(), key=lambda group: group.pk)
+            self._group_names = [group.name for group in groups]
+        return self._group_names
+
+    def forget_group_names(self):
+        self.__dict__.pop("_group_names", None)
+
+    @property
+    def role(self):
+        """Name of the first Group (as groups.first()) or None"""
+        return self.group_names[0] if self.group_names else None
+
+    @property
+    def is_teacher(self):
+        return "Teacher" in self.group_names
+
+    @property
+    def is_student(self):
+        return "Student" in self.group_names
+
     def serialize(self):
         return {
             "id": self.id,
@@ -35,7 +94,7 @@ class User(AbstractUser):
             "email:": self.email,
             "phone_number": self.phone_number,
             "preis_pro_45": self.preis_pro_45,
-            "group": self.groups.first().name,
+            "group": self.role,
         }
 
 
@@ -54,6 +113,125 @@ def validate_pdf(value):
         raise ValidationError("Only (one) PDF file allowed.")
 
 
+def month_range(year, month):
+    """(first day of the month, first day of the next month); raises ValueError if invalid"""
+    first = date(int(year), int(month), 1)
+    if first.month == 12:
+        return first, date(first.year + 1, 1, 1)
+    return first, date(first.year, first.month + 1, 1)
+
+
+def price_expression():
+    """SQL equivalent of Tutoring.price"""
+    # cast to decimal since Postgres only rounds numerics to a given precision
+    exact = Cast(
+        F("student__preis_pro_45") * F("duration") / Value(45.0),
+        DecimalField(max_digits=12, decimal_places=4),
+    )
+    return Case(
+        When(student__preis_pro_45__isnull=True, then=Value(-9999.0)),
+        default=Cast(Round(exact, 2), FloatField()),
+        output_field=FloatField(),
+    )
+
+
+class TutoringQuerySet(models.QuerySet):
+    def serializable(self, *fields):
+        """Joins and loads only the columns Tutoring.serialize needs (and the given fields)"""
+        return self.select_related("subject", "teacher", "student").only(
+            "id",
+            "date",
+            "duration",
+            "content",
+            "pdf",
+            "pdf_status",
+            "pdf_pages",
+            "paid",
+            "modified",  # else not saved (auto_now) when saving a deferred instance
+            "subject__title",
+            "teacher__username",
+            "student__username",
+            "student__preis_pro_45",
+            *fields,
+        )
+
+    def serialize_many(self):
+        """Serializes all Tutorings without lazy loading subject, teacher, student per row"""
+        return [tut.serialize() for tut in self.serializable()]
+
+    def settle(self, paid):
+        """Sets paid of all Tutorings with one UPDATE (no save(), no signals);
+        returns them serialized, refreshed with one more query"""
+        balance_keys = self.balance_keys()
+        self.update(paid=paid, modified=timezone.now())  # auto_now not applied by update()
+        MonthlyBalance.objects.refresh(balance_keys)  # not updated by signals
+        return self.serialize_many()
+
+    def in_month(self, year, month):
+        """Tutorings of the month as a date range (unlike date__year, date__month usable by indexes)"""
+        first, next_first = month_range(year, month)
+        return self.filter(date__gte=first, date__lt=next_first)
+
+    def of_months(self, months):
+        """Tutorings of any of the given (student_username, year, month)"""
+        query = Q(pk__in=[])
+        for student_username, year, month in months:
+            first, next_first = month_range(year, month)
+            query |= Q(student__username=student_username, date__gte=first, date__lt=next_first)
+        return self.filter(query)
+
+    def create_many(self, tutorings, batch_size=500):
+        """bulk_create, which skips save() and signals, plus what they do for new Tutorings"""
+        for tut in tutorings:
+            tut.clean()
+        tutorings = self.bulk_create(tutorings, batch_size=batch_size)
+        MonthlyBalance.objects.refresh({tut.balance_key for tut in tutorings})
+        return tutorings
+
+    def monthly_sums(self, *fields):
+        """Per month (and the given fields): count, minutes, sum_all, sum_paid, sum_unpaid,
+        count_unpaid - aggregated in one query"""
+        price = price_expression()
+        return (
+            self.annotate(month=TruncMonth("date"))
+            .values(*fields, "month")
+            .annotate(
+                count=Count("id"),
+                minutes=Coalesce(Sum("duration"), Value(0)),
+                sum_all=Coalesce(Sum(price), Value(0.0)),
+                sum_paid=Coalesce(Sum(price, filter=Q(paid=True)), Value(0.0)),
+                sum_unpaid=Coalesce(Sum(price, filter=Q(paid=False)), Value(0.0)),
+                count_unpaid=Count("id", filter=Q(paid=False)),
+            )
+            .order_by(*fields, "month")
+        )
+
+    def monthly_summary(self, student=None, teacher=None):
+        """Per month: count, sum_all, sum_paid, sum_unpaid, is_paid - aggregated in one query"""
+        tuts = self
+        if student is not None:
+            tuts = tuts.filter(student=student)
+        if teacher is not None:
+            tuts = tuts.filter(teacher=teacher)
+
+        return (
+            tuts.monthly_sums()
+            .annotate(
+                is_paid=ExpressionWrapper(Q(count_unpaid=0), output_field=BooleanField())
+            )
+            .values("month", "count", "sum_all", "sum_paid", "sum_unpaid", "is_paid")
+        )
+
+    def balance_keys(self):
+        """Distinct (student_id, teacher_id, month) of the Tutorings, see MonthlyBalance"""
+        return set(
+            self.annotate(month=TruncMonth("date"))
+            .values_list("student_id", "teacher_id", "month")
+            .distinct()
+            .order_by()
+        )
+
+
 class Tutoring(models.Model):
     date = models.DateField(default=timezone.now)
     duration = models.PositiveSmallIntegerField(
@@ -64,7 +242,62 @@ class Tutoring(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="learning_tutorings")
     content = models.TextField()
     pdf = models.FileField(upload_to="pdfs/", validators=[validate_pdf], null=True, blank=True)
+    # filled in the background after upload, see pdf_processing
+    pdf_status = models.CharField(
+        max_length=10,
+        choices=[("pending", "Pending"), ("valid", "Valid"), ("invalid", "Invalid")],
+        blank=True,
+    )
+    pdf_pages = models.PositiveIntegerField(null=True, blank=True)
+    pdf_text = models.TextField(blank=True)
     paid = models.BooleanField(default=False)
+    modified = models.DateTimeField(auto_now=True)
+
+    objects = TutoringQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # own Tutorings by date, also seeking (date, id) for the paginated list
+            models.Index(fields=["teacher", "date", "id"], name="tutoring_teacher_date_id"),
+            models.Index(fields=["student", "date", "id"], name="tutoring_student_date_id"),
+            # (un)paid Tutorings of a student per month
+            models.Index(fields=["student", "paid", "date"], name="tutoring_student_paid_date"),
+        ]
+
+    # name of the PDF as loaded from the DB, to only clean up storage if it changed
+    loaded_pdf_name = None
+    # MonthlyBalance the Tutoring was loaded in, to also update it if moved
+    loaded_balance_key = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        tut = super().from_db(db, field_names, values)
+        if "pdf" in field_names:
+            tut.loaded_pdf_name = tut.pdf.name or None
+        if {"student_id", "teacher_id", "date"} <= set(field_names):
+            tut.loaded_balance_key = tut.balance_key
+        return tut
+
+    @property
+    def is_pdf_changed(self):
+        """Whether a new PDF has been set since loaded"""
+        if "pdf" in self.get_deferred_fields():
+            return False
+        return bool(self.pdf) and self.pdf.name != self.loaded_pdf_name
+
+    @property
+    def balance_key(self):
+        """(student_id, teacher_id, month) of the MonthlyBalance the Tutoring counts into"""
+        return (self.student_id, self.teacher_id, self.date.replace(day=1))
+
+    @property
+    def replaced_pdf_name(self):
+        """Name of the loaded PDF if it has been changed or removed since, else None"""
+        if "pdf" in self.get_deferred_fields():
+            return None
+        if self.loaded_pdf_name and self.loaded_pdf_name != self.pdf.name:
+            return self.loaded_pdf_name
+        return None
 
     @property
     def paid_status(self):
@@ -85,12 +318,12 @@ class Tutoring(models.Model):
 
     def clean(self):
         # Ensure only teacher, student user being teacher, student prop
-        if self.teacher and self.teacher.groups.first().name != "Teacher":
+        if self.teacher and self.teacher.role != "Teacher":
             raise ValidationError(
                 "Only users with the Group 'Teacher' can be assigned as teachers for tutoring sessions."
             )
 
-        if self.student and self.student.groups.first().name != "Student":
+        if self.student and self.student.role != "Student":
             raise ValidationError(
                 "Only users with the Group 'Student' can be assigned as students for tutoring sessions."
             )
@@ -103,6 +336,14 @@ class Tutoring(models.Model):
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
+        self.loaded_pdf_name = self.pdf.name or None
+        self.loaded_balance_key = self.balance_key
+
+    @property
+    def pdf_endpoint(self):
+        """API endpoint answering a short-lived download URL of the PDF (see api.views.views_pdf),
+        not the storage's own URL"""
+        return reverse("api:tutoring_pdf", args=[self.id]) if self.pdf else None
 
     # for JSON serialization
     def serialize(self):
@@ -114,8 +355,182 @@ class Tutoring(models.Model):
             "teacher_username": self.teacher.username,
             "student_username": self.student.username,
             "content": self.content, 
-            "pdf": self.pdf.url if self.pdf else None,
+            "pdf": self.pdf_endpoint,
+            "pdf_status": self.pdf_status,
+            "pdf_pages": self.pdf_pages,
             "paid": self.paid,
             "paid_status": self.paid_status,
             "price": self.price
         }
+
+
+class TutoringSearchIndex(models.Model):
+    """Row of the SQLite FTS5 index of a Tutoring (created and kept in sync by migration 0018 and
+    checkweb.search, absent on Postgres); only joined by checkweb.search.search_tutorings"""
+
+    tutoring = models.OneToOneField(
+        Tutoring,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_index",
+    )
+
+    class Meta:
+        managed = False
+        db_table = "checkweb_tutoring_fts"
+
+
+class MonthlyBalanceQuerySet(models.QuerySet):
+    def refresh(self, keys):
+        """Recomputes the balances of the given (student_id, teacher_id, month) from their Tutorings;
+        concurrent refreshes of a student wait for each other (locking the student, as a balance
+        may not exist yet), so each aggregates what the other committed, not overwrites it"""
+        keys = set(keys)
+        if not keys:
+            return
+
+        with transaction.atomic(savepoint=False):
+            if connection.features.has_select_for_update:  # SQLite: writes serialized anyway
+                student_ids = {student_id for student_id, teacher_id, month in keys}
+                students = User.objects.filter(id__in=student_ids).order_by("id")
+                list(students.select_for_update().values_list("id", flat=True))
+            self._refresh(keys)
+
+    def _refresh(self, keys):
+        query = Q(pk__in=[])
+        for student_id, teacher_id, month in keys:
+            first, next_first = month_range(month.year, month.month)
+            query |= Q(student_id=student_id, teacher_id=teacher_id, date__gte=first, date__lt=next_first)
+        sums = Tutoring.objects.filter(query).monthly_sums("student_id", "teacher_id")
+
+        balances = [MonthlyBalance.from_sums(row) for row in sums]
+        self.upsert(balances)
+
+        # balances without Tutorings left
+        stale = keys - {balance.key for balance in balances}
+        if stale:
+            query = Q(pk__in=[])
+            for student_id, teacher_id, month in stale:
+                query |= Q(student_id=student_id, teacher_id=teacher_id, month=month)
+            self.filter(query).delete()
+
+    def rebuild(self):
+        """Recomputes all balances from scratch"""
+        self.all().delete()
+        sums = Tutoring.objects.monthly_sums("student_id", "teacher_id").iterator(chunk_size=2000)
+        self.bulk_create((MonthlyBalance.from_sums(row) for row in sums), batch_size=2000)
+
+    def upsert(self, balances):
+        self.bulk_create(
+            balances,
+            update_conflicts=True,
+            unique_fields=["student", "teacher", "month"],
+            update_fields=[
+                "count",
+                "count_unpaid",
+                "minutes",
+                "sum_all",
+                "sum_paid",
+                "sum_unpaid",
+                "modified",
+            ],
+        )
+
+
+class MonthlyBalance(models.Model):
+    """Sums of all Tutorings of a student with a teacher in a month,
+    kept up to date on every change instead of recomputed per request"""
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    month = models.DateField(help_text="First day of the month.")
+    count = models.PositiveIntegerField(default=0)
+    count_unpaid = models.PositiveIntegerField(default=0)
+    minutes = models.PositiveIntegerField(default=0)
+    sum_all = models.FloatField(default=0)
+    sum_paid = models.FloatField(default=0)
+    sum_unpaid = models.FloatField(default=0)
+    # last refresh (or rename of student or teacher), tells which invoices may be outdated
+    # (see invoices.stale_invoices)
+    modified = models.DateTimeField(auto_now=True)
+
+    objects = MonthlyBalanceQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "teacher", "month"], name="monthly_balance_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"({self.month:%Y-%m}) {self.student_id} by {self.teacher_id}: {self.sum_all}"
+
+    @classmethod
+    def from_sums(cls, row):
+        """MonthlyBalance from a row of TutoringQuerySet.monthly_sums("student_id", "teacher_id")"""
+        return cls(
+            student_id=row["student_id"],
+            teacher_id=row["teacher_id"],
+            month=row["month"],
+            count=row["count"],
+            count_unpaid=row["count_unpaid"],
+            minutes=row["minutes"],
+            sum_all=row["sum_all"],
+            sum_paid=row["sum_paid"],
+            sum_unpaid=row["sum_unpaid"],
+        )
+
+    @property
+    def key(self):
+        return (self.student_id, self.teacher_id, self.month)
+
+
+class Invoice(models.Model):
+    """Invoice PDF of all Tutorings of a student with a teacher in a month, see invoices"""
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    month = models.DateField(help_text="First day of the month.")
+    pdf = models.FileField(upload_to="invoices/")
+    fingerprint = models.CharField(
+        max_length=64, help_text="Hash of the invoiced data; regenerated only when it changes."
+    )
+    balance_modified = models.DateTimeField(
+        null=True, help_text="modified of the MonthlyBalance the invoice was last checked against."
+    )
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["student", "teacher", "month"], name="invoice_unique"),
+        ]
+
+    def __str__(self):
+        return f"({self.month:%Y-%m}) {self.student_id} by {self.teacher_id}"
+
+    @property
+    def key(self):
+        return (self.student_id, self.teacher_id, self.month)
+
+
+class FeedToken(models.Model):
+    """Token of a user's calendar feed, separate from the API token: it is part of the feed URL
+    (and so of access logs) and only grants reading the feed, see api.views.views_calendar"""
+
+    key = models.CharField(max_length=64, unique=True)
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="feed_token")
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"feed of {self.user_id}"
+
+    @classmethod
+    def rotate(cls, user):
+        """New token of the user's feed; the old one stops working"""
+        token, created = cls.objects.update_or_create(
+            user=user, defaults={"key": secrets.token_urlsafe(32)}
+        )
+        return token
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from PyPDF2 import PdfReader
+import logging
+
+from .models import Tutoring
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def executor():
+    """Worker pool shared by all requests of the process"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.PDF_WORKERS, thread_name_prefix="pdf")
+    return _executor
+
+
+def process_pdf(tut_id, name):
+    """Validates the PDF, extracts its page count and text and stores them on the Tutoring
+    (only if its PDF is still the given one)"""
+    storage = Tutoring._meta.get_field("pdf").storage
+    try:
+        with storage.open(name, "rb") as f:
+            reader = PdfReader(f)
+            pages = len(reader.pages)
+            text = "\n".join(page.extract_text() or "" for page in reader.pages)
+        values = {"pdf_status": "valid", "pdf_pages": pages, "pdf_text": text.replace("\x00", "")}
+    except Exception as e:  # PyPDF2 raises all kinds of errors for broken files
+        logger.info("Invalid PDF %s of Tutoring %s: %s", name, tut_id, e)
+        values = {"pdf_status": "invalid", "pdf_pages": None, "pdf_text": ""}
+
+    Tutoring.objects.filter(id=tut_id, pdf=name).update(**values, modified=timezone.now())
+
+
+def process_pdf_in_worker(tut_id, name):
+    try:
+        process_pdf(tut_id, name)
+    except Exception:
+        logger.exception("Processing PDF %s of Tutoring %s failed", name, tut_id)
+    finally:
+        connection.close()  # the worker thread's own connection
+
+
+def submit(tut_id, name):
+    """Processes the PDF on the worker pool, inline if PDF_WORKERS is 0"""
+    if settings.PDF_WORKERS:
+        executor().submit(process_pdf_in_worker, tut_id, name)
+    else:
+        process_pdf(tut_id, name)
+
+
+def schedule_pdf_processing(tut):
+    """Processes the Tutoring's PDF once committed"""
+    tut_id, name = tut.id, tut.pdf.name
+    transaction.on_commit(lambda: submit(tut_id, name))
+
+
+def reschedule_stale_pdfs(older_than=timedelta(minutes=10), inline=False):
+    """Processes the PDFs still pending after older_than again, as their job was lost with its
+    process (recycled or crashed worker, deploy); returns their number
+
+    Each is claimed by bumping its modified first, so concurrent calls (e.g. of all workers
+    starting) process it once."""
+    cutoff = timezone.now() - older_than
+    stale = Tutoring.objects.filter(pdf_status="pending", modified__lt=cutoff)
+
+    count = 0
+    for tut_id, name in stale.values_list("id", "pdf"):
+        if stale.filter(id=tut_id).update(modified=timezone.now()):
+            if inline:
+                process_pdf(tut_id, name)
+            else:
+                submit(tut_id, name)
+            count += 1
+    return count
@@ -0,0 +1,94 @@
+"""Short-lived URLs to up- and download files directly at the storage, so app workers never
+pass the bytes through: S3 presigns them itself; for other storages (the file system locally
+and in tests) they are signed via django.core.signing and served by the storage_view stand-in"""
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils import timezone
+
+import posixpath
+import uuid
+
+SALT = "checkweb.presigned"
+
+
+def is_s3(storage):
+    return hasattr(storage, "bucket_name") and hasattr(storage, "bucket")
+
+
+def sign(data):
+    return signing.dumps(data, salt=SALT)
+
+
+def unsign(token, max_age):
+    """Data of the token; raises signing.BadSignature (or its SignatureExpired) if invalid"""
+    return signing.loads(token, salt=SALT, max_age=max_age)
+
+
+def new_upload_name(field, instance):
+    """Unused storage name for a new upload to the FileField, as upload_to would name it"""
+    return field.generate_filename(instance, f"{uuid.uuid4().hex}.pdf")
+
+
+def upload_url(storage, name, request):
+    """{"url", "method", "fields", "max_size", "expires_in"} to POST the file named name to the
+    storage as multipart form: the fields, then the file as "file" of at most PDF_MAX_SIZE bytes"""
+    expires, max_size = settings.PDF_URL_EXPIRY, settings.PDF_MAX_SIZE
+    fields = {"Content-Type": "application/pdf"}
+    if is_s3(storage):
+        post = storage.bucket.meta.client.generate_presigned_post(
+            storage.bucket_name,
+            storage._normalize_name(name),
+            Fields=fields,
+            Conditions=[fields, ["content-length-range", 1, max_size]],
+            ExpiresIn=expires,
+        )
+        url, fields = post["url"], post["fields"]
+    else:
+        token = sign({"name": name, "method": "POST"})
+        url = request.build_absolute_uri(reverse("checkweb:storage", args=[token]))
+    return {
+        "url": url,
+        "method": "POST",
+        "fields": fields,
+        "max_size": max_size,
+        "expires_in": expires,
+    }
+
+
+def has_pdf_header(storage, name):
+    """Whether the stored file starts as a PDF does (its size is bounded by the upload URL)"""
+    if is_s3(storage):  # only the first bytes, not the whole file
+        obj = storage.bucket.meta.client.get_object(
+            Bucket=storage.bucket_name, Key=storage._normalize_name(name), Range="bytes=0-4"
+        )
+        return obj["Body"].read() == b"%PDF-"
+    with storage.open(name, "rb") as file:
+        return file.read(5) == b"%PDF-"
+
+
+def delete_orphaned_uploads(field, older_than):
+    """Deletes the files in the FileField's upload_to no instance refers to (as uploads never
+    confirmed), if last modified over older_than (timedelta) ago; returns their names"""
+    storage, directory = field.storage, field.upload_to
+    try:
+        names = {posixpath.join(directory, file) for file in storage.listdir(directory)[1]}
+    except FileNotFoundError:  # nothing uploaded yet
+        return []
+
+    referenced = field.model.objects.filter(**{f"{field.name}__in": names})
+    orphaned = names - set(referenced.values_list(field.name, flat=True))
+    deadline = timezone.now() - older_than
+    deleted = sorted(name for name in orphaned if storage.get_modified_time(name) < deadline)
+    for name in deleted:
+        storage.delete(name)
+    return deleted
+
+
+def download_url(storage, name, request):
+    """URL to GET the file named name from the storage, valid for PDF_URL_EXPIRY seconds"""
+    if is_s3(storage):
+        return storage.url(name, expire=settings.PDF_URL_EXPIRY)
+    token = sign({"name": name, "method": "GET"})
+    return request.build_absolute_uri(reverse("checkweb:storage", args=[token]))
@@ -0,0 +1,106 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.core import checks
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Postgres: the GIN index (see migration 0018) is built over exactly this expression
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR = SearchVector("content", "pdf_text", config=SEARCH_CONFIG)
+
+# SQLite: FTS5 table (model TutoringSearchIndex) kept in sync with checkweb_tutoring by triggers,
+# created by migration 0018 and re-created by create_fts_triggers after migrate
+FTS_TABLE = "checkweb_tutoring_fts"
+FTS_TRIGGERS = {
+    f"{FTS_TABLE}_insert": f"""CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON checkweb_tutoring
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, content, pdf_text)
+        VALUES (new.id, new.content, new.pdf_text);
+    END""",
+    f"{FTS_TABLE}_delete": f"""CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON checkweb_tutoring
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content, pdf_text)
+        VALUES ('delete', old.id, old.content, old.pdf_text);
+    END""",
+    f"{FTS_TABLE}_update": f"""CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF content, pdf_text
+    ON checkweb_tutoring BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content, pdf_text)
+        VALUES ('delete', old.id, old.content, old.pdf_text);
+        INSERT INTO {FTS_TABLE}(rowid, content, pdf_text)
+        VALUES (new.id, new.content, new.pdf_text);
+    END""",
+}
+
+
+def fts_query(text):
+    """FTS5 query matching all words of text, without interpreting FTS5 syntax"""
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    return " ".join(words)
+
+
+def search_tutorings(tuts, text):
+    """Tutorings of tuts matching all words of text in content or PDF text,
+    annotated with rank (higher matches better)"""
+    if connection.vendor == "postgresql":
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        return tuts.annotate(search=SEARCH_VECTOR, rank=SearchRank(SEARCH_VECTOR, query)).filter(
+            search=query
+        )
+
+    if connection.vendor == "sqlite":
+        # FTS5 table joined once on rowid (as search_index), bm25 (lower for better matches)
+        # read from that join
+        match = RawSQL(f"{FTS_TABLE} MATCH %s", [fts_query(text)], output_field=BooleanField())
+        return tuts.filter(match, search_index__isnull=False).annotate(
+            rank=RawSQL(f"-bm25({FTS_TABLE})", [], output_field=FloatField())
+        )
+
+    # other databases: unindexed and unranked
+    query = Q()
+    for word in text.split():
+        query &= Q(content__icontains=word) | Q(pdf_text__icontains=word)
+    return tuts.filter(query).annotate(rank=Value(0.0))
+
+
+def missing_fts_triggers(using=DEFAULT_DB_ALIAS):
+    """Names of the FTS5 sync triggers missing on SQLite (dropped by table rebuilds of later
+    migrations, see migration 0018)"""
+    db = connections[using]
+    if db.vendor != "sqlite":
+        return []
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+    return [name for name in FTS_TRIGGERS if name not in existing]
+
+
+def create_fts_triggers(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate: re-creates the missing FTS5 sync triggers and then rebuilds the index, which
+    missed the changes made without them"""
+    db = connections[using]
+    if db.vendor != "sqlite" or FTS_TABLE not in db.introspection.table_names():
+        return
+    missing = missing_fts_triggers(using)
+    if not missing:
+        return
+    with db.cursor() as cursor:
+        for name in missing:
+            cursor.execute(FTS_TRIGGERS[name])
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+@checks.register(checks.Tags.database)
+def check_fts_triggers(app_configs, databases=None, **kwargs):
+    """Run by migrate and check --database default, once the tables exist"""
+    if not databases or "default" not in databases:
+        return []
+    if FTS_TABLE not in connection.introspection.table_names():
+        return []  # not migrated yet
+    return [
+        checks.Warning(
+            f"SQLite trigger {name} is missing, search results are stale.",
+            hint="Run migrate, which re-creates it.",
+            id="checkweb.W001",
+        )
+        for name in missing_fts_triggers()
+    ]
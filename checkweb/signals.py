@@ -1,9 +1,13 @@
-from django.db.models.signals import post_migrate, pre_delete, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, pre_delete, pre_save
 from django.contrib.auth.signals import user_logged_out, user_logged_in
+from django.db import transaction
+from django.db.models import Q
 from django.dispatch import receiver
 from django.contrib.auth.models import Group
 from django.db.models.signals import post_save
-from checkweb.models import User, Tutoring, Subject
+from checkweb.models import Invoice, MonthlyBalance, User, Tutoring, Subject
+from checkweb.caching import AUTH, bump_version_now_and_on_commit
+from checkweb.pdf_processing import schedule_pdf_processing
 from rest_framework.authtoken.models import Token
 from datetime import date, datetime, timedelta
 from django.utils import timezone
@@ -123,19 +127,128 @@ def reset_demo_user(sender, request, user, **kwargs):
         user.delete()
         create_demo_user()
 
+
+def delete_pdf_on_commit(storage, name):
+    """Deletes the file from storage once the current transaction is committed"""
+    transaction.on_commit(lambda: storage.delete(name))
+
+
 @receiver(pre_delete, sender=Tutoring)
 def delete_tutoring_pdf(sender, instance, **kwargs):
     if instance.pdf:
-        instance.pdf.delete(save=False)
+        delete_pdf_on_commit(instance.pdf.storage, instance.pdf.name)
+
+
+@receiver(pre_delete, sender=Invoice)
+def delete_invoice_pdf(sender, instance, **kwargs):
+    if instance.pdf:
+        delete_pdf_on_commit(instance.pdf.storage, instance.pdf.name)
+
+
+@receiver(pre_save, sender=Tutoring)
+def delete_old_pdf(sender, instance, update_fields=None, **kwargs):
+    """Deletes old PDF when changed or removed from model (without refetching it)"""
+    if update_fields is not None and "pdf" not in update_fields:
+        return
+    if instance.replaced_pdf_name:
+        delete_pdf_on_commit(instance.pdf.storage, instance.replaced_pdf_name)
+
 
 @receiver(pre_save, sender=Tutoring)
-def delete_old_pdf(sender, instance, **kwargs):
-    """Deletes old PDF when changed or removed from model"""
-    if instance.pk: # if already in DB
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            if old_instance.pdf:  # if \exists old PDF
-                old_instance.pdf.delete(save=False)  # delete
-        except sender.DoesNotExist:
-            # if no old found or existing
-            pass
\ No newline at end of file
+def reset_pdf_metadata(sender, instance, update_fields=None, **kwargs):
+    """Resets the extracted PDF data when the PDF is changed or removed"""
+    if update_fields is not None and "pdf" not in update_fields:
+        return
+    if instance.is_pdf_changed:
+        instance.pdf_status, instance.pdf_pages, instance.pdf_text = "pending", None, ""
+    elif not instance.pdf and "pdf" not in instance.get_deferred_fields():
+        instance.pdf_status, instance.pdf_pages, instance.pdf_text = "", None, ""
+
+
+@receiver(post_save, sender=Tutoring)
+def process_new_pdf(sender, instance, **kwargs):
+    """Validates and extracts a new PDF in the background, so the upload returns immediately"""
+    if instance.is_pdf_changed:
+        schedule_pdf_processing(instance)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def forget_group_names(sender, instance, action, **kwargs):
+    """Invalidates the cached Group names (role) of a User whose groups changed"""
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, User):
+        instance.forget_group_names()
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_cache_version(sender, update_fields=None, **kwargs):
+    """Invalidates what is cached depending on the changed model, see api.caching;
+    not on each login's save of a User's last_login (not serialized)"""
+    if sender is User and update_fields == {"last_login"}:
+        return
+    bump_version_now_and_on_commit(sender)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def bump_user_cache_version(sender, instance, action, **kwargs):
+    """Users are serialized with their group, authenticated with their role"""
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_version_now_and_on_commit(User)
+        bump_version_now_and_on_commit(AUTH)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def bump_auth_cache_version(sender, **kwargs):
+    """Invalidates cached token authentication, see api.authentication"""
+    bump_version_now_and_on_commit(AUTH)
+
+
+@receiver(post_save, sender=User)
+def bump_auth_cache_version_on_change(sender, instance, created=False, **kwargs):
+    """Only if a field authentication depends on changed, not e.g. on each login's last_login"""
+    if not created and instance.auth_fields != instance.loaded_auth_fields:
+        bump_version_now_and_on_commit(AUTH)
+
+
+@receiver(post_save, sender=Tutoring)
+def update_monthly_balance(sender, instance, **kwargs):
+    """Recomputes the MonthlyBalance of the Tutoring (and the one it was moved away from)"""
+    keys = {instance.balance_key, instance.loaded_balance_key} - {None}
+    MonthlyBalance.objects.refresh(keys)
+
+
+@receiver(post_delete, sender=Tutoring)
+def update_monthly_balance_on_delete(sender, instance, origin=None, **kwargs):
+    """Recomputes the MonthlyBalance of a deleted Tutoring; of many deleted at once (a queryset,
+    a User's cascade) each balance once, after commit"""
+    if origin is None or origin is instance:
+        MonthlyBalance.objects.refresh([instance.balance_key])
+        return
+
+    keys = getattr(origin, "deleted_balance_keys", None)
+    if keys is None:
+        keys = origin.deleted_balance_keys = set()
+        transaction.on_commit(lambda: MonthlyBalance.objects.refresh(keys))
+    keys.add(instance.balance_key)
+
+
+@receiver(post_save, sender=User)
+def outdate_invoices_on_name_change(sender, instance, created=False, **kwargs):
+    """Names are printed on invoices: marks the user's balances as changed, so their invoices
+    are regenerated (see invoices.stale_invoices)"""
+    if not created and instance.name_fields != instance.loaded_name_fields:
+        MonthlyBalance.objects.filter(Q(student=instance) | Q(teacher=instance)).update(
+            modified=timezone.now()
+        )
+
+
+@receiver(post_save, sender=User)
+def update_monthly_balances_on_price_change(sender, instance, created=False, **kwargs):
+    """Recomputes all MonthlyBalances of a student whose price per 45 minutes changed"""
+    if not created and instance.preis_pro_45 != instance.loaded_preis_pro_45:
+        balances = MonthlyBalance.objects.filter(student=instance)
+        MonthlyBalance.objects.refresh(balances.values_list("student_id", "teacher_id", "month"))
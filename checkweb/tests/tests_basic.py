@@ -1,12 +1,16 @@
 from django.test import TestCase, Client
 from django.contrib.auth.models import Group
 from django.utils import timezone
-from ..models import User, Subject, Tutoring
+from ..models import MonthlyBalance, MonthlyBalanceQuerySet, User, Subject, Tutoring
+from django.core.management import call_command
 import datetime
 from django.urls import reverse
 from django.db.utils import IntegrityError
 from django.core.exceptions import ValidationError
 from rest_framework.authtoken.models import Token
+from django.db import connection
+from unittest import mock, skipUnless
+import os
 
 
 class DB_ConsistencyTestCase(TestCase):
@@ -64,6 +68,20 @@ class DB_ConsistencyTestCase(TestCase):
 
         self.assertEqual(self.teach_without_specified_group.groups.first().name, "Student")
         
+    def test_role_cached(self):
+        xavier = User.objects.get(username="Xavier.x")
+
+        # only one query for all role lookups
+        with self.assertNumQueries(1):
+            self.assertEqual(xavier.role, "Teacher")
+            self.assertTrue(xavier.is_teacher)
+            self.assertFalse(xavier.is_student)
+
+        # changing the groups invalidates the cache
+        xavier.groups.set([self.stud])
+        self.assertEqual(xavier.role, "Student")
+        self.assertTrue(xavier.is_student)
+
     def test_default_paid_being_false(self):
         self.assertEqual(self.tut.paid, False)
 
@@ -86,4 +104,173 @@ class DB_ConsistencyTestCase(TestCase):
         self.assertEqual(self.tut.teacher.username, "Xavier.x")
 
     def test_token_post_save(self):
-        self.assertTrue(Token.objects.get(user=self.xavier))
\ No newline at end of file
+        self.assertTrue(Token.objects.get(user=self.xavier))
+
+    def test_monthly_summary(self):
+        Tutoring.objects.create(
+            date=datetime.date(2022, 1, 5),
+            duration=30,
+            subject=Subject.objects.get(title="Math"),
+            student=self.thore,
+            teacher=self.xavier,
+            content="Lorem",
+            paid=True,
+        )
+        Tutoring.objects.create(
+            date=datetime.date(2022, 1, 20),
+            duration=60,
+            subject=Subject.objects.get(title="Math"),
+            student=self.thore,
+            teacher=self.xavier,
+            content="Ipsum",
+        )
+
+        summary = list(Tutoring.objects.monthly_summary(student=self.thore, teacher=self.xavier))
+        january = summary[0]
+
+        # same sums as calculated via Tutoring.price
+        self.assertEqual(len(summary), 2)
+        self.assertEqual(january["month"], datetime.date(2022, 1, 1))
+        self.assertEqual(january["count"], 2)
+        self.assertAlmostEqual(january["sum_all"], 13.33 + 26.67)
+        self.assertAlmostEqual(january["sum_paid"], 13.33)
+        self.assertAlmostEqual(january["sum_unpaid"], 26.67)
+        self.assertFalse(january["is_paid"])
+        self.assertEqual(
+            sum(tut.price for tut in Tutoring.objects.filter(date__year=2022)),
+            january["sum_all"],
+        )
+
+    def test_serialize_many(self):
+        expected = [tut.serialize() for tut in Tutoring.objects.all()]
+
+        # same dicts, but subject, teacher, student joined in the one query
+        with self.assertNumQueries(1):
+            self.assertEqual(Tutoring.objects.all().serialize_many(), expected)
+
+    def test_in_month(self):
+        for day in ("2022-11-30", "2022-12-01", "2022-12-31", "2023-01-01"):
+            Tutoring.objects.create(
+                date=day,
+                duration=45,
+                subject=Subject.objects.get(title="Math"),
+                student=self.thore,
+                teacher=self.xavier,
+                content="Lorem",
+            )
+
+        # first to last day of the month, also across the year
+        december = Tutoring.objects.in_month(2022, 12)
+        self.assertEqual(
+            sorted(tut.date for tut in december),
+            [datetime.date(2022, 12, 1), datetime.date(2022, 12, 31)],
+        )
+        with self.assertRaises(ValueError):
+            Tutoring.objects.in_month(2022, 13)
+
+    @skipUnless(connection.vendor == "postgresql", "EXPLAIN output is Postgres specific")
+    def test_month_filter_uses_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")  # tiny test table: force planner to decide on indexes
+
+        plan_paid = (
+            Tutoring.objects.filter(student=self.thore, paid=False).in_month(2022, 1).explain()
+        )
+        plan_teacher = Tutoring.objects.filter(teacher=self.xavier).in_month(2022, 1).explain()
+
+        self.assertIn("tutoring_student_paid_date", plan_paid)
+        self.assertIn("tutoring_teacher_date_id", plan_teacher)
+        self.assertIn("Index Cond", plan_teacher)
+
+    def test_monthly_balance_incremental(self):
+        def balances():
+            return {
+                balance.month: (balance.count, balance.minutes, balance.sum_all, balance.sum_unpaid)
+                for balance in MonthlyBalance.objects.filter(student=self.thore)
+            }
+
+        tut = Tutoring.objects.create(
+            date="2022-01-05",
+            duration=90,
+            subject=Subject.objects.get(title="Math"),
+            student=self.thore,
+            teacher=self.xavier,
+            content="Lorem",
+        )
+        this_month = timezone.now().date().replace(day=1)
+        january = datetime.date(2022, 1, 1)
+
+        # created
+        self.assertEqual(balances()[january], (1, 90, 40, 40))
+        self.assertEqual(balances()[this_month], (1, 45, 20, 20))
+
+        # paid
+        tut = Tutoring.objects.get(id=tut.id)
+        tut.paid = True
+        tut.save()
+        self.assertEqual(balances()[january], (1, 90, 40, 0))
+
+        # moved to another month
+        tut.date = datetime.date(2022, 2, 1)
+        tut.save()
+        self.assertNotIn(january, balances())
+        self.assertEqual(balances()[datetime.date(2022, 2, 1)], (1, 90, 40, 0))
+
+        # price changed
+        self.thore.preis_pro_45 = 30
+        self.thore.save()
+        self.assertEqual(balances()[this_month], (1, 45, 30, 30))
+
+        # settled in bulk
+        Tutoring.objects.filter(student=self.thore).settle(True)
+        self.assertEqual(balances()[this_month], (1, 45, 30, 0))
+
+        # deleted
+        tut.delete()
+        self.assertEqual(list(balances()), [this_month])
+
+        # rebuilding from scratch gives the same
+        before = balances()
+        call_command("rebuild_monthly_balances", stdout=open(os.devnull, "w"))
+        self.assertEqual(balances(), before)
+
+    def test_monthly_balance_deleted_at_once(self):
+        for day in range(1, 6):
+            Tutoring.objects.create(
+                date=f"2022-01-0{day}",
+                duration=45,
+                subject=Subject.objects.get(title="Math"),
+                student=self.thore,
+                teacher=self.xavier,
+                content="Lorem",
+            )
+
+        # TEST each balance refreshed once, after commit
+        with mock.patch.object(MonthlyBalanceQuerySet, "refresh", autospec=True) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                Tutoring.objects.filter(student=self.thore).delete()
+        refresh.assert_called_once()
+        self.assertEqual(len(refresh.call_args.args[1]), 2)  # January, this month
+
+        # TEST balances of a User's cascade deleted Tutorings as well
+        Tutoring.objects.create(
+            date="2022-01-01",
+            duration=45,
+            subject=Subject.objects.get(title="Math"),
+            student=self.thore,
+            teacher=self.xavier,
+            content="Lorem",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.xavier.delete()
+        self.assertFalse(MonthlyBalance.objects.filter(student=self.thore).exists())
+
+
+class HealthTestCase(TestCase):
+    def test_health(self):
+        client = Client()
+
+        self.assertEqual(client.get(reverse("healthz")).json(), {"status": "ok"})
+        response = client.get(reverse("readyz"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
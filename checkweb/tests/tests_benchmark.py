@@ -0,0 +1,88 @@
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase, TestCase, override_settings
+from ..management.commands.benchmark import Command as BenchmarkCommand
+from ..models import MonthlyBalance, User, Tutoring
+import io
+import json
+import os
+import tempfile
+
+
+class BenchmarkTestCase(TestCase):
+    def test_seed_and_benchmark(self):
+        call_command(
+            "seed_benchmark_data",
+            teachers=2,
+            students=5,
+            tutorings=300,
+            batch_size=100,
+            stdout=io.StringIO(),
+        )
+
+        self.assertEqual(User.objects.filter(username__startswith="bench_teacher").count(), 2)
+        self.assertTrue(User.objects.get(username="bench_student_00000").is_student)
+        self.assertEqual(Tutoring.objects.count(), 300)
+        self.assertEqual(
+            sum(MonthlyBalance.objects.values_list("count", flat=True)), Tutoring.objects.count()
+        )
+
+        paid_before = list(Tutoring.objects.order_by("id").values_list("id", "paid"))
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            # odd number of paid toggles
+            call_command("benchmark", iterations=3, warmup=0, save=baseline, stdout=io.StringIO())
+            with open(baseline) as f:
+                results = json.load(f)
+
+            out = io.StringIO()
+            call_command("benchmark", iterations=2, warmup=0, baseline=baseline, stdout=out)
+
+        self.assertIn("history_view", results)
+        self.assertEqual(set(results["paid_status_post"]), {"p50_ms", "p95_ms", "queries"})
+        self.assertIn("Compared to baseline", out.getvalue())
+
+        # TEST paid status of the toggled month restored
+        self.assertEqual(
+            list(Tutoring.objects.order_by("id").values_list("id", "paid")), paid_before
+        )
+
+        # TEST only seeded teachers, as the benchmark writes
+        with self.assertRaises(CommandError):
+            call_command("benchmark", teacher="nico.st", stdout=io.StringIO())
+
+        # TEST help printable (argparse formats it with %)
+        parser = BenchmarkCommand().create_parser("manage.py", "benchmark")
+        self.assertIn("% slower p95", parser.format_help())
+
+    def test_benchmark_connections(self):
+        out = io.StringIO()
+        call_command("benchmark_connections", iterations=3, stdout=out)
+
+        self.assertIn("new         connection", out.getvalue())
+        self.assertIn("Saving per request by the configured connections", out.getvalue())
+
+
+@override_settings(PDF_WORKERS=0)
+class BenchmarkConcurrencyTestCase(LiveServerTestCase):
+    def test_benchmark_concurrency(self):
+        call_command(
+            "seed_benchmark_data", teachers=1, students=2, tutorings=10, stdout=io.StringIO()
+        )
+
+        # the live server serves the sync and async API alike
+        out = io.StringIO()
+        call_command(
+            "benchmark_concurrency",
+            sync_url=f"{self.live_server_url}/api/",
+            async_url=f"{self.live_server_url}/api/async/",
+            concurrency=1,
+            requests=6,
+            upload_ratio=0.5,
+            upload_kb=1,
+            stdout=out,
+        )
+
+        self.assertIn("async throughput", out.getvalue())
+
+        # TEST uploaded Tutorings deleted again
+        self.assertEqual(Tutoring.objects.count(), 10)
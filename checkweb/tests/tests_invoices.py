@@ -0,0 +1,101 @@
+from django.test import TestCase
+from django.contrib.auth.models import Group
+from ..invoices import generate_invoices
+from ..models import Invoice, User, Subject, Tutoring
+from PyPDF2 import PdfReader
+import datetime
+import io
+
+
+class InvoiceTestCase(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            "demo_teacher", "demo@mail.de", "password", first_name="demo", last_name="teacher"
+        )
+        self.teacher.groups.set([Group.objects.get(name="Teacher")])
+
+        self.students = []
+        for name in ["anna", "jörg"]:
+            student = User.objects.create_user(
+                name, f"{name}@mail.de", "password", first_name=name, last_name="student"
+            )
+            student.groups.set([Group.objects.get(name="Student")])
+            student.preis_pro_45 = 30
+            student.save()
+            self.students.append(student)
+
+        math = Subject.objects.get(title="Math")
+        self.tuts = [
+            Tutoring.objects.create(
+                date=day,
+                duration=45,
+                subject=math,
+                student=student,
+                teacher=self.teacher,
+                content="Satz des Pythagoras",
+            )
+            for student, day in [
+                (self.students[0], "2024-05-02"),
+                (self.students[0], "2024-06-03"),
+                (self.students[0], "2024-06-10"),
+                (self.students[1], "2024-06-04"),
+            ]
+        ]
+
+    def tearDown(self):
+        # prevent PDFs from keeping in Storage
+        with self.captureOnCommitCallbacks(execute=True):
+            Invoice.objects.all().delete()
+
+    def test_generate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            invoices = generate_invoices(self.teacher)
+
+        # one invoice per student and month
+        self.assertEqual(len(invoices), 3)
+        invoice = Invoice.objects.get(student=self.students[0], month=datetime.date(2024, 6, 1))
+        with invoice.pdf.open("rb") as f:
+            text = PdfReader(io.BytesIO(f.read())).pages[0].extract_text()
+        self.assertIn("Invoice 2024-06", text)
+        self.assertIn("2024-06-10", text)
+        self.assertIn("Total: 60.00", text)
+
+        # unchanged: nothing regenerated, no Tutorings loaded (only invoices and balances)
+        with self.assertNumQueries(2):
+            self.assertEqual(generate_invoices(self.teacher), [])
+
+        # changed Tutoring: only its invoice regenerated, old PDF deleted
+        old_name = invoice.pdf.name
+        self.tuts[1].paid = True
+        self.tuts[1].save()
+        with self.captureOnCommitCallbacks(execute=True):
+            invoices = generate_invoices(self.teacher)
+        self.assertEqual([i.key for i in invoices], [invoice.key])
+        self.assertFalse(invoice.pdf.storage.exists(old_name))
+
+        # deleted Tutoring: its month regenerated
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tuts[2].delete()
+            invoices = generate_invoices(self.teacher)
+        self.assertEqual([i.key for i in invoices], [invoice.key])
+
+        # refreshed balance, same data: not regenerated, not fingerprinted again
+        self.tuts[0].save()
+        self.assertEqual(generate_invoices(self.teacher), [])
+        with self.assertNumQueries(2):
+            self.assertEqual(generate_invoices(self.teacher), [])
+
+        # renamed student: their invoices regenerated
+        self.students[1].first_name = "Jörg"
+        self.students[1].save()
+        with self.captureOnCommitCallbacks(execute=True):
+            invoices = generate_invoices(self.teacher)
+        self.assertEqual([i.student_id for i in invoices], [self.students[1].id])
+
+    def test_generate_in_processes(self):
+        invoices = generate_invoices(self.teacher, months=[datetime.date(2024, 6, 1)], workers=2)
+
+        self.assertEqual(len(invoices), 2)
+        for invoice in invoices:
+            with invoice.pdf.open("rb") as f:
+                self.assertTrue(f.read().startswith(b"%PDF"))
@@ -1,4 +1,4 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import Group
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -9,6 +9,12 @@ from django.urls import reverse
 from django.db.utils import IntegrityError
 from django.core.exceptions import ValidationError
 from rest_framework.authtoken.models import Token
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from PyPDF2 import PdfWriter
+from django.core.management import call_command
+from ..pdf_processing import reschedule_stale_pdfs
+import io
 
 class TutoringViewsTestCase(TestCase):
 
@@ -138,4 +144,169 @@ class TutoringViewsTestCase(TestCase):
         
         # prevent PDF from keeping in Storage
         # TODO teardown class
-        Tutoring.objects.get(date="1985-01-01").delete()
\ No newline at end of file
+        with self.captureOnCommitCallbacks(execute=True):
+            Tutoring.objects.get(date="1985-01-01").delete()
+
+    def test_history_only_own_tutorings(self):
+        other_teacher = User.objects.create_user(
+            "other_teacher", "other@mail.de", "password", first_name="other", last_name="teacher"
+        )
+        other_teacher.groups.set([self.teach])
+        Tutoring.objects.create(
+            date="2022-03-01",
+            duration=45,
+            subject=self.subject,
+            student=self.student,
+            teacher=other_teacher,
+            content="Not given by demo_teacher.",
+        )
+
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse("checkweb:history_view"))
+
+        # only the month of the own Tutoring
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [month for month, data in response.context["tuts_by_month"]],
+            [datetime.date(2022, 1, 1)],
+        )
+
+    def test_history_query_count(self):
+        Tutoring.objects.bulk_create(
+            Tutoring(
+                date=datetime.date(2020, 1, 1) + datetime.timedelta(days=3 * i),
+                duration=45,
+                subject=self.subject,
+                student=self.student,
+                teacher=self.teacher,
+                content=f"Session {i}",
+            )
+            for i in range(500)
+        )
+
+        self.client.force_login(self.teacher)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("checkweb:history_view"))
+
+        # fixed handful of queries: session, user, group, Tutorings
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(data["count"] for month, data in response.context["tuts_by_month"]), 501)
+        self.assertEqual(len(queries), 4)
+
+    @override_settings(PDF_WORKERS=0)
+    def test_pdf_kept_on_unrelated_save(self):
+        tut = Tutoring.objects.create(
+            date="2022-02-01",
+            duration=45,
+            subject=self.subject,
+            student=self.student,
+            teacher=self.teacher,
+            content="With PDF.",
+            pdf=ContentFile(self.legal_pdf_content, name="kept.pdf"),
+        )
+        storage = tut.pdf.storage
+        first_pdf = tut.pdf.name
+
+        # toggling paid: no refetch of the Tutoring, PDF untouched
+        tut = Tutoring.objects.get(id=tut.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                tut.paid = True
+                tut.save()
+        self.assertFalse(
+            any(
+                q["sql"].startswith("SELECT") and 'WHERE "checkweb_tutoring"."id" =' in q["sql"]
+                for q in queries.captured_queries
+            )
+        )
+        self.assertTrue(storage.exists(first_pdf))
+
+        # replacing the PDF: old one deleted only after commit (and the new one processed)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            tut.pdf = ContentFile(self.legal_pdf_content, name="replaced.pdf")
+            tut.save()
+            self.assertTrue(storage.exists(first_pdf))
+        self.assertEqual(len(callbacks), 2)
+        self.assertFalse(storage.exists(first_pdf))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tut.delete()
+        self.assertFalse(storage.exists(tut.pdf.name))
+
+    def test_process_pending_pdfs(self):
+        writer = PdfWriter()
+        writer.add_blank_page(width=595, height=842)
+        valid_pdf = io.BytesIO()
+        writer.write(valid_pdf)
+
+        # jobs lost with their process: never run
+        with self.captureOnCommitCallbacks(execute=False):
+            tuts = [
+                Tutoring.objects.create(
+                    date="2022-02-01",
+                    duration=45,
+                    subject=self.subject,
+                    student=self.student,
+                    teacher=self.teacher,
+                    content="With PDF.",
+                    pdf=ContentFile(valid_pdf.getvalue(), name=f"lost_{i}.pdf"),
+                )
+                for i in range(2)
+            ]
+        stale, recent = tuts
+        Tutoring.objects.filter(id=stale.id).update(
+            modified=timezone.now() - datetime.timedelta(minutes=11)
+        )
+
+        call_command("process_pending_pdfs", stdout=io.StringIO())
+
+        # TEST only the PDF pending for longer is processed, and only once
+        self.assertEqual(Tutoring.objects.get(id=stale.id).pdf_status, "valid")
+        self.assertEqual(Tutoring.objects.get(id=recent.id).pdf_status, "pending")
+        self.assertEqual(reschedule_stale_pdfs(datetime.timedelta(0), inline=True), 1)
+        self.assertEqual(Tutoring.objects.get(id=recent.id).pdf_status, "valid")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for tut in tuts:
+                tut.delete()
+
+    @override_settings(PDF_WORKERS=0)
+    def test_pdf_processing(self):
+        writer = PdfWriter()
+        writer.add_blank_page(width=595, height=842)
+        writer.add_blank_page(width=595, height=842)
+        valid_pdf = io.BytesIO()
+        writer.write(valid_pdf)
+
+        # processed once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            tut = Tutoring.objects.create(
+                date="2022-02-01",
+                duration=45,
+                subject=self.subject,
+                student=self.student,
+                teacher=self.teacher,
+                content="With PDF.",
+                pdf=ContentFile(valid_pdf.getvalue(), name="two_pages.pdf"),
+            )
+            self.assertEqual(tut.pdf_status, "pending")
+        tut = Tutoring.objects.get(id=tut.id)
+        self.assertEqual(tut.pdf_status, "valid")
+        self.assertEqual(tut.pdf_pages, 2)
+
+        # unrelated save: not processed again
+        with self.captureOnCommitCallbacks() as callbacks:
+            tut.paid = True
+            tut.save()
+        self.assertEqual(callbacks, [])
+
+        # only .pdf by name, but broken
+        with self.captureOnCommitCallbacks(execute=True):
+            tut.pdf = ContentFile(self.legal_pdf_content, name="broken.pdf")
+            tut.save()
+        tut = Tutoring.objects.get(id=tut.id)
+        self.assertEqual(tut.pdf_status, "invalid")
+        self.assertIsNone(tut.pdf_pages)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tut.delete()
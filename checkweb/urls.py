@@ -1,7 +1,5 @@
 from django.urls import path
 from . import views
-from django.conf import settings
-from django.conf.urls.static import static
 
 app_name = "checkweb"
 
@@ -10,6 +8,8 @@ urlpatterns = [
     path("tutoring", views.tutoring, name="tutoring"),  # only for providing param differently
     path("tutoring/<int:tut_id>", views.tutoring, name="tutoring"),
     path("tutoring_view/<int:tut_id>", views.tutoring_view, name="tutoring_view"),
+    path("tutoring_pdf/<int:tut_id>", views.tutoring_pdf, name="tutoring_pdf"),
+    path("storage/<str:token>", views.storage_view, name="storage"),  # see checkweb.presigned
     path("new_tut", views.new_tut, name="new_tut"),
     path(
         "history_view", views.history_view, name="history_view"
@@ -20,5 +20,3 @@ urlpatterns = [
     path("logout_view", views.logout_view, name="logout_view"),
     path("register", views.register, name="register"),
 ]
-
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
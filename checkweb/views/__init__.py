@@ -1,4 +1,5 @@
 from .views_user import *
 from .views_basic import *
 from .views_tutoring import *
-from .views_user import *
\ No newline at end of file
+from .views_user import *
+from .views_storage import *
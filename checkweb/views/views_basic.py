@@ -22,6 +22,7 @@ import json
 from functools import wraps
 
 from ..models import User, Subject, Tutoring
+from ..ledger import history_months
 
 
 def index(request):
@@ -45,45 +46,17 @@ def index(request):
 @csrf_exempt
 @login_required
 def group_tutorings_by_month(request, student_id):
-    # group by month, count tuts per month
-    result = (
-        Tutoring.objects.annotate(month=TruncMonth("date"))
-        .values("month")
-        .annotate(count=Count("id"))
-    )
-
-    month_objects = {}
-    for entry in result:
-        month = entry["month"]
-        # collect relevant Tutorings in current month
-
-        if request.user.groups.first().name == "Teacher":  # filter tutorings given as teacher
-            if student_id is not None:  # filter for current month, year, teacher INCLUDING student
-                filter_student = User.objects.get(id=student_id)
-                tutorings_for_month = Tutoring.objects.filter(
-                    date__month=month.month,
-                    date__year=month.year,
-                    teacher=request.user,
-                    student=filter_student,
-                )
-            else:  # filter WITHOUT specific student
-                tutorings_for_month = Tutoring.objects.filter(
-                    date__month=month.month, date__year=month.year, teacher=request.user
-                )
-        else:  # filter tutorings taken as student
-            tutorings_for_month = Tutoring.objects.filter(
-                date__month=month.month, date__year=month.year, student=request.user
-            )
-
-        money_for_month = sum(tut.price for tut in tutorings_for_month)
+    # only the Tutorings of the requesting user
+    if request.user.role == "Teacher":  # filter tutorings given as teacher
+        tuts = Tutoring.objects.filter(teacher=request.user)
+        if student_id is not None:  # filter INCLUDING student
+            tuts = tuts.filter(student_id=student_id)
+    else:  # filter tutorings taken as student
+        tuts = Tutoring.objects.filter(student=request.user)
 
-        # save collected data
-        month_objects[month] = {
-            "count": len(tutorings_for_month),
-            "tutorings": tutorings_for_month,
-            "sum_money": money_for_month,
-        }
-    return month_objects.items()
+    # fetch once, then group by month and count, sum tuts per month in memory
+    tuts = tuts.select_related("subject", "teacher", "student").order_by("-date", "-id")
+    return history_months(tuts).items()
 
 
 @csrf_exempt
@@ -29,7 +29,7 @@ def teacher_required(view_func):
     def _wrapped_view(request, *args, **kwargs):
         if not request.user.is_authenticated:  # check if logged in
             return JsonResponse({"error": "Authentication required."}, status=401)
-        if request.user.groups.first().name != "Teacher":  # check if teacher
+        if request.user.role != "Teacher":  # check if teacher
             return JsonResponse(
                 {"error": "Permission denied. This action requires the Group 'Teacher'."},
                 status=403,
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from django.views.decorators.csrf import csrf_exempt
+
+from ..presigned import unsign
+
+# bytes of a multipart upload besides the file: boundaries, headers, fields
+FORM_OVERHEAD = 64 * 1024
+
+
+@csrf_exempt  # authorized by the signed token, not a session
+def storage_view(request, token):
+    """Stand-in for S3 presigned URLs on other storages (see checkweb.presigned):
+    GET downloads, POST uploads (as multipart form, as to S3) the file the token was signed for"""
+
+    try:
+        signed = unsign(token, max_age=settings.PDF_URL_EXPIRY)
+    except signing.BadSignature:
+        return HttpResponseForbidden("Invalid or expired URL.")
+
+    # Guard: the token is only valid for its method
+    if request.method != signed["method"]:
+        return HttpResponse("Method not allowed.", status=405)
+
+    name = signed["name"]
+    if request.method == "GET":
+        if not default_storage.exists(name):
+            return HttpResponseNotFound("File does not exist.")
+        return FileResponse(default_storage.open(name, "rb"), content_type="application/pdf")
+
+    # Guard: upload once, as an upload URL names a new file
+    if default_storage.exists(name):
+        return HttpResponse("File already uploaded.", status=409)
+
+    # Guard: at most PDF_MAX_SIZE bytes (S3 checks the URL's content-length-range), refused
+    # before reading the body
+    try:
+        length = int(request.META.get("CONTENT_LENGTH") or "")
+    except ValueError:
+        return HttpResponse("Content-Length required.", status=411)
+    if length > settings.PDF_MAX_SIZE + FORM_OVERHEAD:
+        return HttpResponse("File too large.", status=413)
+
+    # Guard: the form must contain the file within the size
+    upload = request.FILES.get("file")
+    if upload is None:
+        return HttpResponse("No file given.", status=400)
+    if upload.size > settings.PDF_MAX_SIZE:
+        return HttpResponse("File too large.", status=413)
+
+    # spooled to a temporary file by Django if large, not held in memory
+    default_storage.save(name, upload)
+    return HttpResponse(status=204)
@@ -22,6 +22,7 @@ import json
 from functools import wraps
 
 from ..models import User, Subject, Tutoring
+from ..presigned import download_url
 
 
 class TutForm(forms.Form):
@@ -130,3 +131,15 @@ def tutoring_view(request, tut_id):
         return render(request, "checkweb/tutoring.html", {"tut": tut})
     except Tutoring.DoesNotExist:
         return JsonResponse({"error": f"Tutoring with ID {tut_id} not found."}, status=404)
+
+
+@login_required
+def tutoring_pdf(request, tut_id):
+    """Redirects participants to a short-lived URL of the Tutoring's PDF at the storage"""
+    tut = Tutoring.objects.filter(id=tut_id).only("student", "teacher", "pdf").first()
+    if tut is None or not tut.pdf:
+        return HttpResponseNotFound(f"Tutoring with ID {tut_id} has no PDF.")
+    if request.user.id not in (tut.student_id, tut.teacher_id):
+        return HttpResponseForbidden("Permission denied")
+
+    return redirect(download_url(tut.pdf.storage, tut.pdf.name, request))
@@ -0,0 +1,62 @@
+"""Production server: gunicorn (pre-fork) on checkmathe/wsgi.py, or checkmathe/asgi.py with
+SERVER_INTERFACE=asgi; start via `gunicorn` in the project root (reads this file).
+
+Graceful reload (new code, no dropped requests): kill -HUP <master pid>
+Scale workers at runtime: kill -TTIN / -TTOU <master pid>
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# per container: one worker per core, each with a few threads for requests waiting on the DB
+workers = int(os.getenv("WEB_WORKERS") or multiprocessing.cpu_count())
+threads = int(os.getenv("WEB_THREADS", "4"))
+
+# cached responses and tokens are invalidated via versions in the cache (see checkweb.caching):
+# with a per-process cache, a change handled by one worker would never reach the others
+cache_backend = os.getenv("CACHE_BACKEND") or "LocMemCache"
+if workers > 1 and cache_backend.endswith(("LocMemCache", "DummyCache")):
+    raise RuntimeError(
+        f"{workers} workers need a shared cache, set CACHE_BACKEND (e.g. RedisCache, see "
+        "docker-compose.yml) or WEB_WORKERS=1"
+    )
+
+if os.getenv("SERVER_INTERFACE", "wsgi") == "asgi":
+    wsgi_app = "checkmathe.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "checkmathe.wsgi:application"
+    worker_class = "gthread"
+
+# recycle workers after that many requests (+ jitter, so not all at once) to bound memory growth
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "100"))
+
+# seconds a request may take, resp. workers get to finish their requests on reload/shutdown
+timeout = int(os.getenv("WEB_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# not preloaded: on reload, workers import the new code
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("WEB_LOG_LEVEL", "info")
+
+
+def post_worker_init(worker):
+    """Reprocesses PDFs whose background job was lost with a recycled or crashed worker
+    (see checkweb.pdf_processing); never keeps the worker from starting"""
+    from django.db import connection
+
+    from checkweb.pdf_processing import reschedule_stale_pdfs
+
+    try:
+        reschedule_stale_pdfs()
+    except Exception:
+        worker.log.exception("Rescheduling pending PDFs failed")
+    finally:
+        connection.close()  # of the worker's main thread, requests have their own